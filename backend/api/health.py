@@ -1,30 +1,49 @@
 from fastapi import APIRouter
 from typing import Dict, Any
-import os
-from services.llm_client import GROQ_AVAILABLE, GROQ_API_KEY
+from services.llm_client import GROQ_API_KEY, SUMMARY_MODEL
+from db_operations import pool_stats
 
 router = APIRouter()
 
-@router.get("/health", response_model=Dict[str, Any])
-async def health_check() -> Dict[str, Any]:
-    """Health check endpoint that verifies backend and LLM status"""
+def _build_health_payload() -> Dict[str, Any]:
+    """Build the health payload describing backend and LLM status"""
     llm_status = {
         "available": False,
         "provider": "groq",
-        "model": os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
+        "model": SUMMARY_MODEL,
         "error": None
     }
-    
+
     # Check if LLM is properly configured
-    if not GROQ_AVAILABLE:
-        llm_status["error"] = "Groq SDK not installed"
-    elif not GROQ_API_KEY:
+    if not GROQ_API_KEY:
         llm_status["error"] = "GROQ_API_KEY not configured"
     else:
         llm_status["available"] = True
-    
+
     return {
         "status": "ok",
         "llm": llm_status,
         "version": "1.0.0"
     }
+
+
+_HEALTH_PAYLOAD = _build_health_payload()
+_OK = {"status": "ok"}
+
+
+@router.get("/health", response_model=Dict[str, Any])
+async def health_check() -> Dict[str, Any]:
+    """Health check endpoint that verifies backend and LLM status"""
+    return _HEALTH_PAYLOAD
+
+
+@router.get("/healthz")
+async def healthz() -> Dict[str, str]:
+    """Liveness probe for load balancers; does no LLM or configuration checks"""
+    return _OK
+
+
+@router.get("/internal/db-pools", include_in_schema=False)
+async def db_pools() -> Dict[str, Dict[str, int]]:
+    """Connection counts for the database pools, for internal diagnostics"""
+    return pool_stats()
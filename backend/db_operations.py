@@ -6,9 +6,11 @@ room management, and other persistent data storage.
 """
 import os
 import json
+import queue
+import asyncio
 import sqlite3
+import threading
 from typing import Dict, Optional, Any, List
-from datetime import datetime
 import logging
 from contextlib import contextmanager
 
@@ -19,76 +21,333 @@ logger = logging.getLogger(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, 'warm_transfer.db')
 
-# Ensure the database directory exists
-os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+# Bumped whenever init_db() changes the schema; stored in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# Per-connection tuning. journal_mode=WAL persists on the database file, so it
+# is applied once in init_db(); these settings only last for a connection.
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA busy_timeout=5000',
+)
+
+# Connection pools. Reads and writes use separate pools so bursts of status
+# polling can't take every connection and leave webhook writes waiting; SQLite
+# only admits one writer at a time, so the write pool stays small.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_WRITE_POOL_SIZE = int(os.getenv("DB_WRITE_POOL_SIZE", "2"))
+STATEMENT_CACHE_SIZE = 256
+
+# Schema, applied by init_db() as a single script and transaction
+SCHEMA_DDL = f"""
+BEGIN IMMEDIATE;
+
+-- Calls placed through Twilio
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    call_sid TEXT UNIQUE NOT NULL,
+    room_name TEXT NOT NULL,
+    phone_number TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Room state
+CREATE TABLE IF NOT EXISTS rooms (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_name TEXT UNIQUE NOT NULL,
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Room participants
+CREATE TABLE IF NOT EXISTS room_members (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_name TEXT NOT NULL,
+    identity TEXT NOT NULL,
+    role TEXT NOT NULL,
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(room_name, identity)
+);
+
+-- Serves "latest call for a room" (WHERE room_name ORDER BY created_at DESC)
+-- with a single index seek, and covers status/error so get_call_state()
+-- never reads the table; supersedes the earlier room_name indexes
+DROP INDEX IF EXISTS idx_calls_room;
+DROP INDEX IF EXISTS idx_calls_room_created;
+CREATE INDEX IF NOT EXISTS idx_calls_room_state ON calls(room_name, created_at DESC, status, error);
+CREATE INDEX IF NOT EXISTS idx_calls_status ON calls(status);
+-- UNIQUE(room_name, identity) already indexes room_name lookups and is the
+-- covering index for is_room_member(); a separate room_name index is redundant
+DROP INDEX IF EXISTS idx_room_members_room;
+CREATE INDEX IF NOT EXISTS idx_room_members_identity ON room_members(identity);
+
+-- Populate sqlite_stat1 so the planner sees real index selectivity
+ANALYZE;
+
+PRAGMA user_version={SCHEMA_VERSION};
+
+COMMIT;
+"""
+
+# Metadata storage. SQLite 3.45+ stores metadata as binary JSONB, parsed once
+# on write; reads convert it back to JSON text. Older SQLite keeps plain JSON
+# text. json() accepts either representation, so existing rows need no
+# migration.
+JSONB_SUPPORTED = sqlite3.sqlite_version_info >= (3, 45, 0)
+if JSONB_SUPPORTED:
+    _JSON_IN = 'jsonb'
+    _METADATA_OUT = 'json(metadata) AS metadata'
+else:
+    _JSON_IN = ''
+    _METADATA_OUT = 'metadata'
+
+# SQL statements. Every query is a constant string so sqlite3's per-connection
+# prepared-statement cache can reuse the compiled statement across calls.
+# Column lists are explicit so reads only materialize what callers use.
+CALL_COLUMNS = f"id, call_sid, room_name, phone_number, status, error, {_METADATA_OUT}, created_at, updated_at"
+ROOM_COLUMNS = f"id, room_name, {_METADATA_OUT}, created_at, updated_at"
+ROOM_MEMBER_COLUMNS = f"id, room_name, identity, role, {_METADATA_OUT}, created_at, updated_at"
+
+# Fields that are not provided keep their stored value. Metadata is only
+# rewritten when an update is supplied, so the stored blob is never parsed
+# for plain status changes; set_call_status() passes the already-merged blob.
+# Parameters: ?1 call_sid, ?2 room_name, ?3 phone_number, ?4 status,
+# ?5 error, ?6 metadata JSON.
+_SQL_CALL_UPDATE_SET = f"""
+        status = COALESCE(?4, calls.status),
+        phone_number = COALESCE(NULLIF(?3, ''), calls.phone_number),
+        error = COALESCE(?5, calls.error),
+        metadata = CASE
+            WHEN ?6 IS NULL THEN calls.metadata
+            ELSE {_JSON_IN}(?6)
+        END,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+SQL_UPSERT_CALL = f"""
+    INSERT INTO calls (
+        call_sid, room_name, phone_number, status, error, metadata
+    ) VALUES (?1, ?2, COALESCE(?3, ''), COALESCE(?4, 'initiated'), ?5, {_JSON_IN}(?6))
+    ON CONFLICT(call_sid) DO UPDATE SET {_SQL_CALL_UPDATE_SET}
+    RETURNING {CALL_COLUMNS}
+"""
+
+SQL_UPDATE_CALL_BY_SID = f"""
+    UPDATE calls SET {_SQL_CALL_UPDATE_SET}
+    WHERE call_sid = ?1
+    RETURNING {CALL_COLUMNS}
+"""
+
+SQL_UPDATE_LATEST_CALL_BY_ROOM = f"""
+    UPDATE calls SET {_SQL_CALL_UPDATE_SET}
+    WHERE id = (
+        SELECT id FROM calls WHERE room_name = ?2
+        ORDER BY created_at DESC LIMIT 1
+    )
+    RETURNING {CALL_COLUMNS}
+"""
+
+SQL_GET_CALL_BY_SID = f'SELECT {CALL_COLUMNS} FROM calls WHERE call_sid = ? ORDER BY created_at DESC LIMIT 1'
+SQL_GET_CALL_METADATA_BY_SID = f'SELECT {_METADATA_OUT} FROM calls WHERE call_sid = ?'
+SQL_GET_CALL_METADATA_BY_ROOM = (
+    f'SELECT {_METADATA_OUT} FROM calls WHERE room_name = ? ORDER BY created_at DESC LIMIT 1'
+)
+SQL_GET_CALL_BY_ROOM = f'SELECT {CALL_COLUMNS} FROM calls WHERE room_name = ? ORDER BY created_at DESC LIMIT 1'
+# Served entirely from idx_calls_room_state without touching the table
+SQL_GET_CALL_STATE_BY_ROOM = 'SELECT status, error FROM calls WHERE room_name = ? ORDER BY created_at DESC LIMIT 1'
+
+SQL_GET_ROOM = f'SELECT {ROOM_COLUMNS} FROM rooms WHERE room_name = ?'
+SQL_UPSERT_ROOM = f"""
+    INSERT INTO rooms (room_name, metadata) VALUES (?, {_JSON_IN}(?))
+    ON CONFLICT(room_name) DO UPDATE SET
+        metadata = excluded.metadata,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING {ROOM_COLUMNS}
+"""
+
+SQL_UPSERT_ROOM_MEMBER = f"""
+    INSERT INTO room_members (room_name, identity, role, metadata, updated_at)
+    VALUES (?, ?, ?, {_JSON_IN}(?), CURRENT_TIMESTAMP)
+    ON CONFLICT(room_name, identity) DO UPDATE SET
+        role = excluded.role,
+        metadata = excluded.metadata,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING {ROOM_MEMBER_COLUMNS}
+"""
+SQL_GET_ROOM_MEMBERS = f'SELECT {ROOM_MEMBER_COLUMNS} FROM room_members WHERE room_name = ?'
+SQL_IS_ROOM_MEMBER = 'SELECT EXISTS(SELECT 1 FROM room_members WHERE room_name = ? AND identity = ?)'
 
 def init_db():
     """Initialize the database with required tables."""
-    with db_connection() as conn:
+    with db_connection(write=True) as conn:
         cursor = conn.cursor()
         
-        # Create calls table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS calls (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            call_sid TEXT UNIQUE NOT NULL,
-            room_name TEXT NOT NULL,
-            phone_number TEXT NOT NULL,
-            status TEXT NOT NULL,
-            error TEXT,
-            metadata TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        # Already-initialized databases skip the DDL entirely
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
         
-        # Create rooms table for tracking room state
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS rooms (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            room_name TEXT UNIQUE NOT NULL,
-            metadata TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        # WAL lets readers and the writer proceed concurrently. It cannot be
+        # switched inside a transaction, so it runs ahead of the schema script.
+        cursor.execute('PRAGMA journal_mode=WAL')
         
-        # Create room_members table for tracking room participants
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS room_members (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            room_name TEXT NOT NULL,
-            identity TEXT NOT NULL,
-            role TEXT NOT NULL,
-            metadata TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(room_name, identity)
-        )
-        ''')
-        
-        # Create indexes for better query performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_room ON calls(room_name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_calls_status ON calls(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_room_members_room ON room_members(room_name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_room_members_identity ON room_members(identity)')
+        # Databases created before room_members tracked updates lack updated_at
+        cursor.execute('PRAGMA table_info(room_members)')
+        columns = {row['name'] for row in cursor.fetchall()}
+        if columns and 'updated_at' not in columns:
+            cursor.execute('ALTER TABLE room_members ADD COLUMN updated_at TIMESTAMP')
+            # Existing members were last updated when they joined
+            cursor.execute(
+                'UPDATE room_members SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) '
+                'WHERE updated_at IS NULL'
+            )
         
-        conn.commit()
+        # All tables and indexes are created in one transaction
+        conn.executescript(SCHEMA_DDL)
         logger.info("Database tables initialized")
 
+def _new_connection(read_only: bool = False) -> sqlite3.Connection:
+    """Open a connection with row access and per-connection pragmas applied."""
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        isolation_level=None,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    conn.row_factory = sqlite3.Row  # Enable dictionary-style access
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute('PRAGMA query_only=ON')
+    return conn
+
+class _ConnectionPool:
+    """
+    Connections opened lazily up to ``size`` and reused LIFO, so the most
+    recently used (warmest) connection is handed out first.
+    """
+
+    def __init__(self, name: str, size: int, read_only: bool = False):
+        self.name = name
+        self.size = size
+        self.read_only = read_only
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take a pooled connection, opening a new one while under the pool size."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if self._created < self.size:
+                conn = _new_connection(self.read_only)
+                self._created += 1
+                return conn
+        
+        return self._idle.get()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a healthy connection to the pool."""
+        self._idle.put(conn)
+
+    def discard(self, conn: sqlite3.Connection) -> None:
+        """Close a broken connection and free its slot in the pool."""
+        _close_connection(conn)
+        with self._lock:
+            self._created -= 1
+
+    def close_idle(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(conn)
+
+    def stats(self) -> Dict[str, int]:
+        idle = self._idle.qsize()
+        return {"size": self.size, "open": self._created, "idle": idle, "in_use": self._created - idle}
+
+_READ_POOL = _ConnectionPool("read", DB_POOL_SIZE, read_only=True)
+_WRITE_POOL = _ConnectionPool("write", DB_WRITE_POOL_SIZE)
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Connection counts for the read and write pools, for health reporting."""
+    return {pool.name: pool.stats() for pool in (_READ_POOL, _WRITE_POOL)}
+
+def _close_connection(conn: sqlite3.Connection) -> None:
+    """Refresh planner statistics if needed, then close the connection."""
+    try:
+        # Cheap incremental ANALYZE that only touches tables whose stats drifted
+        conn.execute('PRAGMA optimize')
+    except sqlite3.Error:
+        pass
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+def close_db() -> None:
+    """Close every idle pooled connection, e.g. on application shutdown."""
+    _READ_POOL.close_idle()
+    _WRITE_POOL.close_idle()
+
 @contextmanager
-def db_connection():
-    """Context manager for database connections with error handling."""
-    conn = None
+def db_connection(write: bool = False):
+    """
+    Context manager lending a pooled database connection with error handling.
+    
+    Read connections are query-only; pass ``write=True`` to borrow from the
+    write pool instead.
+    """
+    pool = _WRITE_POOL if write else _READ_POOL
+    conn = pool.acquire()
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=30.0)
-        conn.row_factory = sqlite3.Row  # Enable dictionary-style access
         yield conn
     except sqlite3.Error as e:
-        logger.error(f"Database error: {e}")
+        logger.error("Database error: %s", e)
+        pool.discard(conn)
+        conn = None
         raise
     finally:
-        if conn:
-            conn.close()
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            pool.release(conn)
+
+@contextmanager
+def db_transaction():
+    """
+    Context manager running the block as one explicit write transaction.
+    
+    Connections are in autocommit mode, so writes take the write lock up
+    front with BEGIN IMMEDIATE and commit as soon as the block finishes
+    rather than relying on sqlite3's implicit transaction handling.
+    """
+    with db_connection(write=True) as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
 
 # Call management functions
 def set_call_status(
@@ -116,97 +375,39 @@ def set_call_status(
     if not call_sid and not room_name:
         raise ValueError("Either call_sid or room_name must be provided")
     
-    with db_connection() as conn:
+    with db_transaction() as conn:
         cursor = conn.cursor()
         
-        # Check if we have an existing call for this room
-        existing = None
-        if room_name:
-            cursor.execute(
-                'SELECT * FROM calls WHERE room_name = ? ORDER BY created_at DESC LIMIT 1',
-                (room_name,)
-            )
-            existing = cursor.fetchone()
-        
-        # Prepare metadata
-        meta_dict = {}
-        if existing and existing['metadata']:
-            meta_dict = json.loads(existing['metadata'])
-        
+        meta_json = None
         if metadata:
-            meta_dict.update(metadata)
+            # Shallow merge like dict.update: top-level keys are replaced
+            # whole and None values are stored, not treated as deletions
+            if call_sid:
+                cursor.execute(SQL_GET_CALL_METADATA_BY_SID, (call_sid,))
+            else:
+                cursor.execute(SQL_GET_CALL_METADATA_BY_ROOM, (room_name,))
+            row = cursor.fetchone()
+            merged = json.loads(row[0]) if row and row[0] else {}
+            merged.update(metadata)
+            meta_json = json.dumps(merged)
+        params = (call_sid, room_name, phone_number, status, error, meta_json)
         
-        meta_json = json.dumps(meta_dict) if meta_dict else None
+        if call_sid and room_name:
+            # Create the call record or update it in place
+            cursor.execute(SQL_UPSERT_CALL, params)
+        elif call_sid:
+            cursor.execute(SQL_UPDATE_CALL_BY_SID, params)
+        else:
+            # Update the most recent call for the room
+            cursor.execute(SQL_UPDATE_LATEST_CALL_BY_ROOM, params)
         
-        if existing:
-            # Update existing call
-            update_fields = []
-            params = []
-            
-            if call_sid and call_sid != existing['call_sid']:
-                update_fields.append('call_sid = ?')
-                params.append(call_sid)
-            
-            if status:
-                update_fields.append('status = ?')
-                params.append(status)
-            
-            if phone_number:
-                update_fields.append('phone_number = ?')
-                params.append(phone_number)
-            
-            if error is not None:
-                update_fields.append('error = ?')
-                params.append(error)
-            
-            if meta_json is not None:
-                update_fields.append('metadata = ?')
-                params.append(meta_json)
-            
-            if update_fields:
-                update_fields.append('updated_at = CURRENT_TIMESTAMP')
-                update_sql = f"""
-                    UPDATE calls 
-                    SET {', '.join(update_fields)}
-                    WHERE id = ?
-                """
-                params.append(existing['id'])
-                cursor.execute(update_sql, params)
-                
-                # Get the updated record
-                cursor.execute('SELECT * FROM calls WHERE id = ?', (existing['id'],))
-                result = dict(cursor.fetchone())
-                logger.debug(f"Updated call status: {result}")
-                return result
-            
-            return dict(existing)
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError("call_sid and room_name are required for new call records")
         
-        else:
-            # Create new call record
-            if not call_sid or not room_name:
-                raise ValueError("call_sid and room_name are required for new call records")
-            
-            cursor.execute("""
-                INSERT INTO calls (
-                    call_sid, room_name, phone_number, status, error, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                call_sid,
-                room_name,
-                phone_number or '',
-                status or 'initiated',
-                error,
-                meta_json
-            ))
-            
-            call_id = cursor.lastrowid
-            conn.commit()
-            
-            # Get the newly created record
-            cursor.execute('SELECT * FROM calls WHERE id = ?', (call_id,))
-            result = dict(cursor.fetchone())
-            logger.info(f"Created new call record: {result}")
-            return result
+        result = dict(row)
+        logger.debug("Upserted call status: %s", result)
+        return result
 
 def get_call_status(room_name: str = None, call_sid: str = None) -> Optional[Dict[str, Any]]:
     """
@@ -226,27 +427,51 @@ def get_call_status(room_name: str = None, call_sid: str = None) -> Optional[Dic
         cursor = conn.cursor()
         
         if call_sid:
-            cursor.execute(
-                'SELECT * FROM calls WHERE call_sid = ? ORDER BY created_at DESC LIMIT 1',
-                (call_sid,)
-            )
+            cursor.execute(SQL_GET_CALL_BY_SID, (call_sid,))
         else:
-            cursor.execute(
-                'SELECT * FROM calls WHERE room_name = ? ORDER BY created_at DESC LIMIT 1',
-                (room_name,)
-            )
+            cursor.execute(SQL_GET_CALL_BY_ROOM, (room_name,))
         
         row = cursor.fetchone()
         if row:
             return dict(row)
         return None
 
+def get_call_state(room_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Get only the status and error of the latest call for a room.
+    
+    Args:
+        room_name: The room name to look up
+        
+    Returns:
+        A dictionary with ``status`` and ``error``, or None if not found
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SQL_GET_CALL_STATE_BY_ROOM, (room_name,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+# Async entry points. sqlite3 calls block, so async handlers should use these
+# to run the query in a worker thread instead of stalling the event loop.
+async def aset_call_status(*args, **kwargs) -> Dict[str, Any]:
+    """Async variant of set_call_status() that runs in a worker thread."""
+    return await asyncio.to_thread(set_call_status, *args, **kwargs)
+
+async def aget_call_status(*args, **kwargs) -> Optional[Dict[str, Any]]:
+    """Async variant of get_call_status() that runs in a worker thread."""
+    return await asyncio.to_thread(get_call_status, *args, **kwargs)
+
+async def aget_call_state(room_name: str) -> Optional[Dict[str, Any]]:
+    """Async variant of get_call_state() that runs in a worker thread."""
+    return await asyncio.to_thread(get_call_state, room_name)
+
 # Room management functions
 def get_room(room_name: str) -> Optional[Dict[str, Any]]:
     """Get room information by name."""
     with db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM rooms WHERE room_name = ?', (room_name,))
+        cursor.execute(SQL_GET_ROOM, (room_name,))
         row = cursor.fetchone()
         return dict(row) if row else None
 
@@ -254,28 +479,14 @@ def create_room(room_name: str, metadata: Optional[Dict[str, Any]] = None) -> Di
     """Create a new room or update an existing one."""
     meta_json = json.dumps(metadata) if metadata else None
     
-    with db_connection() as conn:
+    with db_transaction() as conn:
         cursor = conn.cursor()
         
-        # Try to insert new room
-        try:
-            cursor.execute(
-                'INSERT INTO rooms (room_name, metadata) VALUES (?, ?)',
-                (room_name, meta_json)
-            )
-            conn.commit()
-            logger.info(f"Created new room: {room_name}")
-        except sqlite3.IntegrityError:
-            # Room already exists, update it
-            cursor.execute(
-                'UPDATE rooms SET metadata = ?, updated_at = CURRENT_TIMESTAMP WHERE room_name = ?',
-                (meta_json, room_name)
-            )
-            conn.commit()
-            logger.debug(f"Updated existing room: {room_name}")
+        # Insert the room, or update it in place if it already exists
+        cursor.execute(SQL_UPSERT_ROOM, (room_name, meta_json))
+        logger.debug("Upserted room: %s", room_name)
         
         # Return the room data
-        cursor.execute('SELECT * FROM rooms WHERE room_name = ?', (room_name,))
         return dict(cursor.fetchone())
 
 # Room member functions
@@ -283,55 +494,25 @@ def add_room_member(room_name: str, identity: str, role: str, metadata: Optional
     """Add a member to a room or update their role/metadata."""
     meta_json = json.dumps(metadata) if metadata else None
     
-    with db_connection() as conn:
+    with db_transaction() as conn:
         cursor = conn.cursor()
         
-        # Check if member already exists
-        cursor.execute(
-            'SELECT * FROM room_members WHERE room_name = ? AND identity = ?',
-            (room_name, identity)
-        )
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing member
-            cursor.execute("""
-                UPDATE room_members 
-                SET role = ?, metadata = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE room_name = ? AND identity = ?
-            """, (role, meta_json, room_name, identity))
-        else:
-            # Add new member
-            cursor.execute("""
-                INSERT INTO room_members (room_name, identity, role, metadata)
-                VALUES (?, ?, ?, ?)
-            """, (room_name, identity, role, meta_json))
-        
-        conn.commit()
+        # Add the member, or update their role/metadata if already present
+        cursor.execute(SQL_UPSERT_ROOM_MEMBER, (room_name, identity, role, meta_json))
         
         # Return the updated member record
-        cursor.execute(
-            'SELECT * FROM room_members WHERE room_name = ? AND identity = ?',
-            (room_name, identity)
-        )
         return dict(cursor.fetchone())
 
 def get_room_members(room_name: str) -> List[Dict[str, Any]]:
     """Get all members of a room."""
     with db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM room_members WHERE room_name = ?', (room_name,))
+        cursor.execute(SQL_GET_ROOM_MEMBERS, (room_name,))
         return [dict(row) for row in cursor.fetchall()]
 
 def is_room_member(room_name: str, identity: str) -> bool:
     """Check if a user is a member of a room."""
     with db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            'SELECT 1 FROM room_members WHERE room_name = ? AND identity = ?',
-            (room_name, identity)
-        )
-        return cursor.fetchone() is not None
-
-# Initialize the database when this module is imported
-init_db()
+        cursor.execute(SQL_IS_ROOM_MEMBER, (room_name, identity))
+        return bool(cursor.fetchone()[0])
@@ -12,7 +12,7 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-# Verify required environment variables are set
+# Environment variables the service needs; checked once logging is configured
 required_vars = [
     'LIVEKIT_API_KEY',
     'LIVEKIT_API_SECRET',
@@ -23,38 +23,56 @@ required_vars = [
     'TWILIO_PHONE_NUMBER'
 ]
 
-for var in required_vars:
-    if not os.getenv(var):
-        print(f"Warning: Required environment variable {var} is not set")
-import uuid
-import os
+import sys
+import json
 import time
+import random
+import weakref
+import urllib.parse
+import queue
+import atexit
 import logging
-import uuid
+import logging.handlers
 import asyncio
+import importlib.util
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List, Any
 
 # Third-party imports
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Header, Request, status
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, ORJSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
-import logging
-from typing import Dict, Any
-import os
+import anyio.to_thread
+
+from api import api_router
 
+# orjson serializes responses faster and emits bytes directly; fall back to
+# the stdlib-backed JSONResponse when it is not installed
+DefaultResponse = ORJSONResponse if importlib.util.find_spec("orjson") else JSONResponse
 
-# Import LLM client to check its status
-from services.llm_client import GROQ_AVAILABLE, GROQ_API_KEY
+# HTTP/2 lets concurrent Groq requests share one connection; httpx needs the
+# optional h2 package for it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Configure logging; DEBUG=true enables verbose output
+DEBUG = os.getenv("DEBUG") == "true"
+LOG_LEVEL = logging.DEBUG if DEBUG else logging.INFO
+
+# app.log is written by a listener thread so request handlers never block on disk I/O
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.FileHandler('app.log'))
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
-# Configure logging with debug level
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=LOG_LEVEL,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler('app.log')
+        logging.handlers.QueueHandler(_log_queue)
     ]
 )
 
@@ -63,10 +81,10 @@ logger = logging.getLogger(__name__)
 
 # Configure specific loggers
 loggers = {
-    'twilio': logging.DEBUG,
-    'livekit': logging.DEBUG,
-    'aiohttp': logging.DEBUG,
-    'asyncio': logging.DEBUG,
+    'twilio': LOG_LEVEL,
+    'livekit': LOG_LEVEL,
+    'aiohttp': LOG_LEVEL,
+    'asyncio': LOG_LEVEL,
     'websockets': logging.INFO,  # Less verbose
     'urllib3': logging.INFO,     # Less verbose
     'PIL': logging.INFO,         # Less verbose
@@ -78,42 +96,59 @@ for log_name, level in loggers.items():
 
 logger.debug("Debug logging enabled")
 
+# Report all missing configuration at once; FAIL_FAST=true refuses to start
+missing_vars = [var for var in required_vars if not os.environ.get(var)]
+if missing_vars:
+    logger.warning("Missing required environment variables: %s", ", ".join(missing_vars))
+    if os.environ.get("FAIL_FAST") == "true":
+        sys.exit(1)
+
+# Worker threads for blocking calls (Twilio, SQLite); sized
+# well above the defaults so slow upstream calls can't starve other endpoints
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "200"))
+
+# Outbound HTTP (Groq, LiveKit server API) shares one connection pool per worker
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "50"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up the database and background tasks once per worker process."""
+    # asyncio.to_thread uses the loop's default executor; sync dependencies
+    # and def endpoints go through anyio's limiter
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREADPOOL_SIZE, thread_name_prefix="blocking")
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    app.state.http = httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=10,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE
+        )
+    )
+    init_db()
+    init_twilio_client()
+    if os.getenv("DEBUG_ROUTES"):
+        # Logged after startup so every route, not just those registered so far, is listed
+        logger.info("Registered routes: %s", [getattr(route, "path", None) for route in app.routes])
+    cleanup_task = asyncio.create_task(cleanup_stale_rooms_task())
+    logger.info("Started background cleanup task")
+    # Don't hold startup on Groq; the first transfer reuses the warmed connection
+    warm_up_task = asyncio.create_task(warm_up_llm(app.state.http))
+    yield
+    warm_up_task.cancel()
+    cleanup_task.cancel()
+    await app.state.http.aclose()
+    close_db()
+
 # Initialize FastAPI app
-app = FastAPI(title="Warm Transfer MVP")
-
-# Register health check endpoint at the root level
-@app.get("/health")
-async def health_check() -> Dict[str, Any]:
-    """Health check endpoint that verifies backend and LLM status"""
-    llm_status = {
-        "available": False,
-        "provider": "groq",
-        "model": os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
-        "error": None
-    }
-    
-    # Check if LLM is properly configured
-    if not GROQ_AVAILABLE:
-        llm_status["error"] = "Groq SDK not installed"
-    elif not GROQ_API_KEY:
-        llm_status["error"] = "GROQ_API_KEY not configured"
-    else:
-        llm_status["available"] = True
-    
-    return {
-        "status": "ok",
-        "llm": llm_status,
-        "version": "1.0.0"
-    }
+app = FastAPI(title="Warm Transfer MVP", lifespan=lifespan, default_response_class=DefaultResponse)
 
-# Debug: Print all routes
-print("\nRegistered routes:")
-for route in app.routes:
-    if hasattr(route, 'path'):
-        print(f"- {route.path}")
-    elif hasattr(route, 'routes'):
-        for r in route.routes:
-            print(f"- {r.path}")
+# Register health check endpoints (/health, /healthz) at the root level
+app.include_router(api_router)
 
 # Add CORS middleware
 app.add_middleware(
@@ -129,6 +164,16 @@ app.add_middleware(
 # Twilio imports
 from twilio.rest import Client as TwilioClient
 from twilio.base.exceptions import TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
+from tenacity import (
+    AsyncRetrying,
+    stop_after_attempt,
+    wait_exponential_jitter,
+    retry_if_exception_type,
+    before_sleep_log
+)
+from requests.adapters import HTTPAdapter
+from xml.sax.saxutils import escape as xml_escape
 
 # Import models
 from models import (
@@ -142,122 +187,204 @@ from models import (
 
 # Import services and database operations
 import transcripts
-from services.livekit_client import mint_access_token, validate_room_membership, disconnect_participant
-from services.llm_client import generate_summary
+from services.livekit_client import (
+    mint_access_token, mint_tokens_bulk, cached_validate_room_membership, disconnect_participant
+)
+from services.llm_client import generate_summary, get_cached_summary, warm_up as warm_up_llm
 from db_operations import (
-    set_call_status, get_call_status,
-    create_room as db_create_room,
-    add_room_member, get_room_members,
-    is_room_member
+    init_db, close_db,
+    aset_call_status, aget_call_status
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG if os.getenv("DEBUG") == "true" else logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
-logger = logging.getLogger(__name__)
+# Identity assigned to the caller when minting tokens for the transfer room
+CALLER_IDENTITY = os.getenv("CALLER_IDENTITY", "caller")
 
-# Thread lock for transfer operations with timeouts
-from threading import Lock, Timer, RLock
-from typing import Dict, Optional, Set
-from datetime import datetime, timedelta
+# Room names and participant identities only need to be unique, not secret
+# (access is granted by the signed token), so their suffixes come from a PRNG
+# seeded once instead of an os.urandom syscall per request. Pre-forked
+# workers would inherit the same state, so each child reseeds after fork
+_suffix_rng = random.Random(os.urandom(16))
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _suffix_rng.seed(os.urandom(16)))
+
+
+def unique_suffix() -> str:
+    """Return an 8 hex digit suffix for generated room names and identities"""
+    return f"{_suffix_rng.getrandbits(32):08x}"
+
+from threading import Lock
+from typing import Set
 
 # Room state management
+class RoomEntry:
+    """State and creation time of a single room, kept together for one lookup per access"""
+
+    __slots__ = ("state", "created_at")
+
+    def __init__(self, state: Dict, created_at: datetime):
+        self.state = state
+        self.created_at = created_at
+
+
 class RoomState:
+    """
+    Room state store optimized for lock-free reads.
+
+    Writers serialize on a single lock and publish a fresh copy of the rooms
+    mapping (copy-on-write) when rooms are added or removed; state updates
+    swap in a new state dict on the existing entry. Readers only perform a
+    dict lookup on the currently published snapshot and never take a lock.
+    """
+
     def __init__(self):
-        self._lock = RLock()
-        self._rooms: Dict[str, Dict] = {}  # room_name -> state
-        self._room_creation_time: Dict[str, datetime] = {}
+        self._write_lock = Lock()
+        # room_name -> entry (published snapshot); insertion order is creation
+        # order, so the oldest rooms come first
+        self._rooms: Dict[str, RoomEntry] = {}
         self._room_timeout = timedelta(hours=1)  # Room timeout
 
-    def create_room(self, room_name: str, initial_state: Optional[dict] = None):
-        with self._lock:
+    def create_room(self, room_name: str, initial_state: Optional[dict] = None,
+                    created_at: Optional[datetime] = None):
+        with self._write_lock:
             if room_name not in self._rooms:
-                self._rooms[room_name] = initial_state or {}
-                self._room_creation_time[room_name] = datetime.utcnow()
-                logger.info(f"Created room {room_name} with state: {initial_state}")
+                rooms = dict(self._rooms)
+                rooms[room_name] = RoomEntry(dict(initial_state or {}), created_at or datetime.utcnow())
+                self._rooms = rooms
+                logger.info("Created room %s with state: %s", room_name, initial_state)
                 return True
             return False
 
     def get_room_state(self, room_name: str) -> Optional[dict]:
-        with self._lock:
-            return self._rooms.get(room_name)
+        entry = self._rooms.get(room_name)
+        return entry.state if entry is not None else None
 
     def update_room_state(self, room_name: str, updates: dict) -> bool:
-        with self._lock:
-            if room_name in self._rooms:
-                self._rooms[room_name].update(updates)
-                logger.debug(f"Updated room {room_name} state: {updates}")
+        with self._write_lock:
+            entry = self._rooms.get(room_name)
+            if entry is not None:
+                entry.state = {**entry.state, **updates}
+                logger.debug("Updated room %s state: %s", room_name, updates)
                 return True
             return False
 
     def remove_room(self, room_name: str) -> bool:
-        with self._lock:
+        with self._write_lock:
             if room_name in self._rooms:
-                del self._rooms[room_name]
-                if room_name in self._room_creation_time:
-                    del self._room_creation_time[room_name]
-                logger.info(f"Removed room {room_name}")
+                rooms = dict(self._rooms)
+                del rooms[room_name]
+                self._rooms = rooms
+                logger.info("Removed room %s", room_name)
                 return True
             return False
 
+    def next_expiry_time(self) -> Optional[datetime]:
+        """Return when the oldest room becomes stale, or None if there are no rooms"""
+        for entry in self._rooms.values():
+            return entry.created_at + self._room_timeout
+        return None
+
     def cleanup_stale_rooms(self) -> int:
-        """Remove rooms that have exceeded their timeout"""
-        removed = 0
-        now = datetime.utcnow()
-        
-        with self._lock:
-            stale_rooms = [
-                room for room, created in self._room_creation_time.items()
-                if now - created > self._room_timeout
-            ]
-            
+        """Remove rooms that have exceeded their timeout.
+
+        Rooms are kept oldest first, so the scan stops at the first room that
+        is still fresh and stale rooms are dropped in one snapshot.
+        """
+        cutoff = datetime.utcnow() - self._room_timeout
+
+        with self._write_lock:
+            stale_rooms = []
+            for room, entry in self._rooms.items():
+                if entry.created_at >= cutoff:
+                    break
+                stale_rooms.append(room)
+
+            if not stale_rooms:
+                return 0
+
+            rooms = dict(self._rooms)
             for room in stale_rooms:
-                self.remove_room(room)
-                removed += 1
-                
-        if removed > 0:
-            logger.info(f"Cleaned up {removed} stale rooms")
-            
-        return removed
+                del rooms[room]
+            self._rooms = rooms
+
+        logger.info("Cleaned up %d stale rooms", len(stale_rooms))
+        return len(stale_rooms)
 
 # Global room state manager
 room_state_manager = RoomState()
 
-# Transfer lock management
-transfer_locks: Dict[str, Lock] = {}
-LOCK_TIMEOUT = 30  # seconds
+# Transfer lock management; asyncio locks suspend the waiting coroutine
+# instead of blocking the event loop thread while a transfer is in flight.
+# Entries are weakly held, so a room's lock disappears once no transfer
+# holds or waits on it and the mapping cannot grow without bound.
+transfer_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
 
-def release_lock(room_name: str):
-    """Release the transfer lock for a room if it exists"""
-    if room_name in transfer_locks:
-        try:
-            transfer_locks[room_name].release()
-            logger.debug(f"Released lock for room {room_name}")
-        except Exception as e:
-            logger.warning(f"Error releasing lock for room {room_name}: {e}")
-            # Lock might already be released
+
+def get_transfer_lock(room_name: str) -> asyncio.Lock:
+    """Return the transfer lock for a room, creating it if nobody holds one"""
+    lock = transfer_locks.get(room_name)
+    if lock is None:
+        lock = asyncio.Lock()
+        transfer_locks[room_name] = lock
+    return lock
+
+
+# Transcripts shorter than this carry nothing worth an LLM round trip
+MIN_SUMMARY_TRANSCRIPT_LENGTH = 40
+# Opt-in: short transcripts are handed over verbatim instead of summarized
+EXTRACTIVE_FAST_PATH = os.getenv("EXTRACTIVE_FAST_PATH") == "1"
+EXTRACTIVE_MAX_LENGTH = int(os.getenv("EXTRACTIVE_MAX_LENGTH", "400"))
+# How long /transfer waits for the LLM summary before handing over a
+# placeholder; the summary is still stored for /room/{room}/summary
+TRANSFER_SUMMARY_TIMEOUT = float(os.getenv("TRANSFER_SUMMARY_TIMEOUT", "8"))
+
+
+def immediate_summary(transcript: Optional[str]) -> Optional[str]:
+    """Return a summary that needs no LLM call: canned for trivial transcripts,
+    verbatim for short ones when EXTRACTIVE_FAST_PATH is on, else cached"""
+    text = (transcript or "").strip()
+    if len(text) < MIN_SUMMARY_TRANSCRIPT_LENGTH:
+        notes = text.replace('\n', ' ') or "No transcript available"
+        return f"No substantive transcript yet — Notes: {notes} — please verify details."
+    if EXTRACTIVE_FAST_PATH and len(text) < EXTRACTIVE_MAX_LENGTH:
+        return "(auto) " + " ".join(line.strip() for line in text.splitlines() if line.strip())
+    return get_cached_summary(transcript)
+
+
+async def summarize_transcript(transcript: Optional[str]) -> str:
+    """Summarize a transcript, skipping the LLM for empty or trivial ones"""
+    return immediate_summary(transcript) or await generate_summary(app.state.http, transcript)
+
+
+async def refresh_room_summary(room_name: str, summary_task: "asyncio.Future[str]", placeholder: str) -> None:
+    """Replace a room's placeholder summary with the LLM summary once it is generated"""
+    try:
+        summary = await summary_task
+    except Exception as e:
+        logger.error("Background summary for room %s failed: %s", room_name, e, exc_info=True)
+        return
+
+    # A later transfer may already have stored a newer summary
+    if await transcripts.aget_room_summary(room_name) != placeholder:
+        return
+    await transcripts.aset_room_summary(room_name, summary)
+    room_state_manager.update_room_state(room_name, {"summary": summary})
+    logger.debug("Stored generated summary for room %s", room_name)
 
 # Background task to clean up stale rooms
 async def cleanup_stale_rooms_task():
-    """Background task to clean up stale rooms"""
+    """Background task to clean up stale rooms, waking when the oldest room expires"""
     while True:
+        next_expiry = room_state_manager.next_expiry_time()
+        if next_expiry is None:
+            # No rooms yet; check back in 5 minutes
+            await asyncio.sleep(300)
+            continue
+
+        await asyncio.sleep(max(1.0, (next_expiry - datetime.utcnow()).total_seconds()))
         try:
-            removed = room_state_manager.cleanup_stale_rooms()
-            if removed > 0:
-                logger.info(f"Cleaned up {removed} stale rooms")
+            room_state_manager.cleanup_stale_rooms()
         except Exception as e:
-            logger.error(f"Error in cleanup task: {e}", exc_info=True)
-        
-        # Sleep for 5 minutes between cleanups
-        await asyncio.sleep(300)  # 5 minutes
-
-# Start the cleanup task when the app starts
-@app.on_event("startup")
-async def startup_event():
-    asyncio.create_task(cleanup_stale_rooms_task())
-    logger.info("Started background cleanup task")
+            logger.error("Error in cleanup task: %s", e, exc_info=True)
 
 # App initialization moved to the top of the file
 
@@ -275,11 +402,11 @@ async def test_llm():
     
     try:
         logger.info("Testing LLM with sample conversation...")
-        result = generate_summary(test_text)
-        logger.info(f"LLM test successful. Result: {result}")
+        result = await generate_summary(app.state.http, test_text)
+        logger.info("LLM test successful. Result: %s", result)
         return f"LLM Test Successful!\n\nSummary:\n{result}"
     except Exception as e:
-        logger.error(f"LLM test failed: {str(e)}", exc_info=True)
+        logger.error("LLM test failed: %s", e, exc_info=True)
         return f"LLM Test Failed!\n\nError: {str(e)}\n\nPlease check the backend logs for more details."
 
 # Authentication is disabled for assessment purposes
@@ -288,24 +415,24 @@ def verify_api_key():
 
 
 @app.post("/create-room", response_model=CreateRoomResponse)
-def create_room(req: CreateRoomRequest):
-    room_name = req.room_name or f"room-{uuid.uuid4().hex[:8]}"
+async def create_room(req: CreateRoomRequest):
+    room_name = req.room_name or f"room-{unique_suffix()}"
     try:
-        logger.info(f"Creating room: {room_name} for identity: {req.identity}")
+        logger.info("Creating room: %s for identity: %s", room_name, req.identity)
         token = mint_access_token(room_name=room_name, identity=req.identity, role=req.role)
     except Exception as e:
-        logger.error(f"Failed to create room/token: {e}")
+        logger.error("Failed to create room/token: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create room/token: {e}")
     return CreateRoomResponse(room_name=room_name, token=token)
 
 
 @app.post("/join-token", response_model=JoinTokenResponse)
-def join_token(req: JoinTokenRequest):
+async def join_token(req: JoinTokenRequest):
     try:
-        logger.info(f"Generating join token for room: {req.room_name}, identity: {req.identity}")
+        logger.info("Generating join token for room: %s, identity: %s", req.room_name, req.identity)
         token = mint_access_token(room_name=req.room_name, identity=req.identity, role="participant")
     except Exception as e:
-        logger.error(f"Failed to mint token: {e}")
+        logger.error("Failed to mint token: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to mint token: {e}")
     return JoinTokenResponse(token=token)
 
@@ -322,205 +449,162 @@ async def transfer(req: TransferRequest, background_tasks: BackgroundTasks):
     4. Transfers call context and transcripts
     5. Manages room state and locking
     """
-    logger.info(f"Received transfer request: {req}")
+    logger.info(
+        "Received transfer request: %s -> %s (initiator=%s, target=%s)",
+        req.from_room, req.to_room, req.initiator_identity, req.target_identity
+    )
     start_time = time.time()
+    # One timestamp for every state field this request writes
+    now = datetime.utcnow()
+    now_iso = now.isoformat()
     
     def log_duration():
         duration = time.time() - start_time
-        logger.info(f"Transfer request completed in {duration:.2f} seconds")
-        
-    async def cleanup_on_error(room_name: str):
-        """Clean up resources if an error occurs during transfer."""
-        try:
-            if room_name in room_state_manager._rooms:
-                room_state_manager.update_room_state(room_name, {
-                    "status": "error",
-                    "error_time": datetime.utcnow().isoformat()
-                })
-                logger.warning(f"Cleaned up room state for {room_name} due to error")
-        except Exception as e:
-            logger.error(f"Error during cleanup for {room_name}: {e}", exc_info=True)
+        logger.info("Transfer request completed in %.2f seconds", duration)
     
     # Register cleanup to log duration
     background_tasks.add_task(log_duration)
     
-    # Initialize variables for cleanup
-    to_room = None
+    # Validate request
+    if not req.from_room:
+        error_msg = "Source room name is required"
+        logger.error(error_msg)
+        raise HTTPException(status_code=400, detail=error_msg)
     
-    try:
-        # Validate request
-        if not req.from_room:
-            error_msg = "Source room name is required"
-            logger.error(error_msg)
-            raise HTTPException(status_code=400, detail=error_msg)
-        
-        if not req.initiator_identity or not req.target_identity:
-            error_msg = "Initiator and target identities are required"
-            logger.error(error_msg)
-            raise HTTPException(status_code=400, detail=error_msg)
+    if not req.initiator_identity or not req.target_identity:
+        error_msg = "Initiator and target identities are required"
+        logger.error(error_msg)
+        raise HTTPException(status_code=400, detail=error_msg)
+    
+    # Acquire lock for this room to prevent simultaneous transfers
+    async with get_transfer_lock(req.from_room):
+        logger.info("Acquired transfer lock for room: %s", req.from_room)
         
-        # Acquire lock for this room to prevent simultaneous transfers
-        with transfer_locks.setdefault(req.from_room, Lock()):
-            logger.info(f"Acquired transfer lock for room: {req.from_room}")
+        # Use the same room for the transfer
+        to_room = req.from_room
+        logger.info("Initiating transfer in room: %s", to_room)
             
-            # Use the same room for the transfer
-            to_room = req.from_room
-            logger.info(f"Initiating transfer in room: {to_room}")
-                
-            try:
-                # Update the existing room state
-                room_state = room_state_manager.get_room_state(to_room)
-                if not room_state:
-                    room_state_manager.create_room(to_room, {
-                        "status": "active",
-                        "created_at": datetime.utcnow().isoformat(),
-                        "participants": [req.initiator_identity, req.target_identity],
-                        "transfer_initiated_at": datetime.utcnow().isoformat(),
-                        "initiator": req.initiator_identity,
-                        "target": req.target_identity
-                    })
-                
-                # Store any provided transcript updates
-                if req.transcript and req.transcript.strip():
-                    logger.debug(f"Updating transcript for room {to_room}")
-                    transcripts.set_room_transcript(to_room, req.transcript.strip())
-                
-                # Get existing transcripts
-                logger.debug(f"Retrieving existing transcripts for room {to_room}")
-                existing_transcripts = transcripts.get_room_transcripts(to_room)
-                existing_transcript = "\n".join(existing_transcripts) if existing_transcripts else ""
-                
-                # Generate summary using LLM or fallback to a simple summary
-                summary_text = ""
-                try:
-                    logger.info("Generating call summary...")
-                    summary_text = generate_summary(existing_transcript or "")
-                    logger.debug(f"Generated summary: {summary_text[:100]}...")
-                except Exception as e:
-                    error_msg = f"Failed to generate summary: {e}"
-                    logger.error(error_msg, exc_info=True)
-                    # Fallback summary if LLM fails
-                    first_120_chars = (existing_transcript or "")[:120].replace('\n', ' ').strip()
-                    summary_text = f"LLM unavailable — Notes: {first_120_chars} — please verify details."
-                    logger.warning(f"Using fallback summary: {summary_text}")
-                
-                # Update the room with transfer information
-                room_state_manager.update_room_state(to_room, {
-                    "status": "transferring",
-                    "transfer_initiated_at": datetime.utcnow().isoformat(),
+        try:
+            # Update the existing room state
+            room_state = room_state_manager.get_room_state(to_room)
+            if not room_state:
+                room_state_manager.create_room(to_room, {
+                    "status": "active",
+                    "created_at": now_iso,
+                    "participants": [req.initiator_identity, req.target_identity],
+                    "transfer_initiated_at": now_iso,
                     "initiator": req.initiator_identity,
-                    "target": req.target_identity,
-                    "summary": summary_text
-                })
-                
+                    "target": req.target_identity
+                }, created_at=now)
+            
+            # Store any provided transcript updates
+            transcript_update = (req.transcript or "").strip()
+            if transcript_update:
+                logger.debug("Updating transcript for room %s", to_room)
+                await transcripts.aset_room_transcript(to_room, transcript_update)
+            
+            # Get existing transcripts
+            logger.debug("Retrieving existing transcripts for room %s", to_room)
+            existing_transcript = await transcripts.aget_joined_transcript(to_room)
+            
+            # The initiating agent hands this summary over, so wait for the
+            # LLM, but only up to TRANSFER_SUMMARY_TIMEOUT; past that answer
+            # with a placeholder and store the real summary once it is ready
+            summary_text = immediate_summary(existing_transcript)
+            if summary_text is None:
+                logger.info("Generating call summary for room %s", to_room)
+                summary_task = asyncio.ensure_future(generate_summary(app.state.http, existing_transcript))
                 try:
-                    # Store summary and transcript in the room
-                    logger.debug(f"Storing summary and transcript in room: {to_room}")
-                    transcripts.set_room_summary(to_room, summary_text)
-                    if existing_transcript:
-                        transcripts.set_room_transcript(to_room, existing_transcript)
-                    
-                    # Generate tokens for all participants
-                    logger.info("Generating participant tokens...")
-                    
-                    # Token for the initiator (Agent A) - stays in the same room
-                    initiator_token = mint_access_token(
-                        room_name=to_room, 
-                        identity=req.initiator_identity, 
-                        role="agent"
-                    )
-                    
-                    # Token for the target agent (Agent B) - joins the same room
-                    target_token = mint_access_token(
-                        room_name=to_room, 
-                        identity=req.target_identity, 
-                        role="agent"
+                    summary_text = await asyncio.wait_for(
+                        asyncio.shield(summary_task), TRANSFER_SUMMARY_TIMEOUT
                     )
-                    
-                    # Token for the caller (already in the room)
-                    caller_identity = os.getenv("CALLER_IDENTITY", "caller")
-                    caller_token = mint_access_token(
-                        room_name=to_room, 
-                        identity=caller_identity, 
-                        role="caller"
-                    )           # Log the transfer for auditing
-                    logger.info(f"Transfer setup complete: {req.from_room} -> {to_room}")
-                    
-                    # Prepare response
-                    return TransferResponse(
-                        to_room=to_room,  # Same as from_room since we're using the same room
-                        initiator_token=initiator_token,
-                        target_token=target_token,
-                        caller_token=caller_token,
-                        summary=summary_text,
+                except asyncio.TimeoutError:
+                    first_120_chars = existing_transcript[:120].replace('\n', ' ').strip()
+                    summary_text = f"Summary pending — Notes: {first_120_chars} — please verify details."
+                    logger.warning(
+                        "Summary for room %s not ready after %.1fs; handing over a placeholder",
+                        to_room, TRANSFER_SUMMARY_TIMEOUT
                     )
-                    
-                    logger.debug("Transfer response prepared successfully")
-                    return response
-                    
-                except Exception as e:
-                    error_msg = f"Failed to complete transfer setup: {e}"
-                    logger.error(error_msg, exc_info=True)
-                    # Clean up the new room if it was created
-                    if to_room and to_room in room_state_manager._rooms:
-                        await cleanup_on_error(to_room)
-                    raise HTTPException(status_code=500, detail=error_msg)
-                    
-            except Exception as e:
-                error_msg = f"Transfer failed: {e}"
-                logger.error(error_msg, exc_info=True)
-                
-                # Clean up any created resources
-                if to_room:
-                    await cleanup_on_error(to_room)
-                if req.from_room in room_state_manager._rooms:
-                    await cleanup_on_error(req.from_room)
-                    
-        raise
-        
-    except Exception as e:
-        error_msg = f"Unexpected error during transfer: {e}"
-        logger.error(error_msg, exc_info=True)
-        
-        # Clean up any created resources
-        if to_room:
-            await cleanup_on_error(to_room)
-        if req.from_room in room_state_manager._rooms:
-            await cleanup_on_error(req.from_room)
+                    background_tasks.add_task(refresh_room_summary, to_room, summary_task, summary_text)
             
-        raise HTTPException(
-            status_code=500,
-            detail="An unexpected error occurred during transfer. Please try again."
-        )
-        
-    finally:
-        # Always ensure the lock is released
-        if req.from_room in transfer_locks and transfer_locks[req.from_room].locked():
-            try:
-                transfer_locks[req.from_room].release()
-                logger.info(f"Released transfer lock for room: {req.from_room}")
-            except Exception as e:
-                logger.error(f"Error releasing lock for room {req.from_room}: {e}", exc_info=True)
+            # Update the room with transfer information
+            room_state_manager.update_room_state(to_room, {
+                "status": "transferring",
+                "transfer_initiated_at": now_iso,
+                "initiator": req.initiator_identity,
+                "target": req.target_identity,
+                "summary": summary_text
+            })
+            
+            # Store the summary; the transcript already lives in this room
+            logger.debug("Storing summary in room: %s", to_room)
+            await transcripts.aset_room_summary(to_room, summary_text)
+            
+            # Generate tokens for all participants
+            logger.info("Generating participant tokens...")
+            
+            # Tokens for the initiator (Agent A, stays in the room), the
+            # target agent (Agent B, joins the room) and the caller
+            # (already in the room) share one timestamp and signing pass
+            initiator_token, target_token, caller_token = mint_tokens_bulk(
+                room_name=to_room,
+                identities_and_roles=[
+                    (req.initiator_identity, "agent"),
+                    (req.target_identity, "agent"),
+                    (CALLER_IDENTITY, "caller"),
+                ],
+            )
+
+            # Log the transfer for auditing
+            logger.info("Transfer setup complete: %s -> %s", req.from_room, to_room)
+            
+            return TransferResponse(
+                to_room=to_room,  # Same as from_room since we're using the same room
+                initiator_token=initiator_token,
+                target_token=target_token,
+                caller_token=caller_token,
+                summary=summary_text,
+            )
+            
+        except Exception as e:
+            logger.error("Transfer failed: %s", e, exc_info=True)
+            
+            # Mark the room as failed so clients stop waiting on the transfer
+            if room_state_manager.update_room_state(to_room, {
+                "status": "error",
+                "error_time": now_iso
+            }):
+                logger.warning("Marked room %s as errored after failed transfer", to_room)
                 
+            raise HTTPException(
+                status_code=500,
+                detail="An unexpected error occurred during transfer. Please try again."
+            )
+
+
 @app.get("/room/{room_name}/summary", response_model=RoomSummaryResponse)
-def room_summary(room_name: str):
-    logger.info(f"Fetching summary for room: {room_name}")
+async def room_summary(room_name: str):
+    logger.info("Fetching summary for room: %s", room_name)
     
     # Get transcripts from the database
-    existing_transcripts = transcripts.get_room_transcripts(room_name)
-    existing_transcript = "\n".join(existing_transcripts) if existing_transcripts else ""
+    existing_transcript = await transcripts.aget_joined_transcript(room_name)
     
-    return RoomSummaryResponse(
-        summary=transcripts.get_room_summary(room_name) or "",
-        transcript=existing_transcript or "",
-    )
+    # Transcripts can be large; returning the response directly skips
+    # building the model and FastAPI's jsonable_encoder pass over it, while
+    # response_model still documents the shape
+    return DefaultResponse({
+        "summary": await transcripts.aget_room_summary(room_name) or "",
+        "transcript": existing_transcript or "",
+    })
 
 
 @app.post("/validate-membership", response_model=ValidateMembershipResponse)
-def validate_membership(req: ValidateMembershipRequest):
-    logger.info(f"Validating membership for {req.identity} in room {req.room_name}")
+async def validate_membership(req: ValidateMembershipRequest):
+    logger.info("Validating membership for %s in room %s", req.identity, req.room_name)
     try:
-        is_member = validate_room_membership(room_name=req.room_name, identity=req.identity)
+        is_member = await cached_validate_room_membership(
+            app.state.http, room_name=req.room_name, identity=req.identity
+        )
         if is_member:
             return ValidateMembershipResponse(
                 is_member=True,
@@ -532,17 +616,10 @@ def validate_membership(req: ValidateMembershipRequest):
                 message=f"User {req.identity} is not a member of room {req.room_name}"
             )
     except Exception as e:
-        logger.error(f"Error validating membership: {e}")
-        # Fallback to checking ROOM_STORE
-        room_data = transcripts.ROOM_STORE.get(req.room_name, {})
-        if room_data.get("members", {}).get(req.identity):
-            return ValidateMembershipResponse(
-                is_member=True,
-                message=f"User {req.identity} is a member of room {req.room_name} (from store)"
-            )
-        return ValidateMembershipResponse(
-            is_member=False,
-            message=f"Could not validate membership: {e}"
+        logger.error("Error validating membership: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": "validation_failed", "message": "Failed to validate room membership"}
         )
 
 
@@ -553,6 +630,23 @@ TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
 TWILIO_TIMEOUT = int(os.getenv("TWILIO_TIMEOUT", "30"))  # Default 30 seconds
 MAX_RETRIES = int(os.getenv("TWILIO_MAX_RETRIES", "3"))
 TWILIO_RETRY_DELAY = float(os.getenv("TWILIO_RETRY_DELAY", "1.0"))  # Initial delay in seconds
+TWILIO_POOL_SIZE = int(os.getenv("TWILIO_POOL_SIZE", "32"))
+BASE_URL = os.getenv("BASE_URL", "").strip()  # Public URL for Twilio status callbacks
+# With BASE_URL set Twilio pushes status changes to /twilio-status, so polling
+# the REST API is only a fallback for deployments without a public callback URL
+ENABLE_POLLING_FALLBACK = os.getenv(
+    "ENABLE_POLLING_FALLBACK", "false" if BASE_URL else "true"
+).lower() == "true"
+
+# TwiML played to the transfer target before bridging them into the LiveKit room
+TWIML_TEMPLATE = (
+    '<Response><Say voice="Polly.Joanna" language="en-US">'
+    'Hello. You are being connected for a warm transfer. '
+    "Here's a summary of the conversation so far: {summary} "
+    'Please wait while we connect you to the call.</Say>'
+    '<Connect><Room participantIdentity="{tid}">{room}</Room></Connect></Response>'
+)
+_XML_ATTR_ENTITIES = {'"': "&quot;"}
 
 # Flag to track if Twilio is properly configured
 TWILIO_ENABLED = all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER])
@@ -577,9 +671,39 @@ def check_twilio_config():
         )
 
 # Twilio client initialization
+_TWILIO_CLIENT: Optional[TwilioClient] = None
+_twilio_client_lock = Lock()
+
+
+def init_twilio_client() -> None:
+    """Create the process-wide Twilio client if Twilio is configured.
+
+    Called once at startup. The client keeps a pooled keep-alive session so
+    repeated API calls reuse TCP/TLS connections instead of handshaking on
+    every request.
+    """
+    global _TWILIO_CLIENT
+    if not TWILIO_ENABLED:
+        return
+    with _twilio_client_lock:
+        if _TWILIO_CLIENT is None:
+            http_client = TwilioHttpClient(pool_connections=True, timeout=TWILIO_TIMEOUT)
+            adapter = HTTPAdapter(pool_connections=TWILIO_POOL_SIZE, pool_maxsize=TWILIO_POOL_SIZE)
+            http_client.session.mount("https://", adapter)
+            _TWILIO_CLIENT = TwilioClient(
+                TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, http_client=http_client
+            )
+
+
 def get_twilio_client():
-    check_twilio_config()
-    return TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+    """Return the shared Twilio client, raising 501 if Twilio is not configured"""
+    client = _TWILIO_CLIENT
+    if client is None:
+        check_twilio_config()
+        # Only reached when the app runs without its lifespan (e.g. scripts)
+        init_twilio_client()
+        client = _TWILIO_CLIENT
+    return client
 
 
 @app.post("/twilio-transfer", response_model=TwilioTransferResponse)
@@ -601,18 +725,26 @@ async def twilio_transfer(req: TwilioTransferRequest, background_tasks: Backgrou
         # Check Twilio configuration before proceeding
         check_twilio_config()
         
-        logger.info(f"Initiating Twilio transfer request: {req.dict()}")
+        logger.info(
+            "Initiating Twilio transfer request: room=%s, caller=%s, phone=%s",
+            req.from_room, req.caller_identity, req.phone_number
+        )
         
         # Validate room exists and caller is a participant
         try:
-            if not validate_room_membership(room_name=req.from_room, identity=req.caller_identity):
-                logger.error(f"Caller {req.caller_identity} is not a member of room {req.from_room}")
+            is_member = await cached_validate_room_membership(
+                app.state.http, room_name=req.from_room, identity=req.caller_identity
+            )
+            if not is_member:
+                logger.error("Caller %s is not a member of room %s", req.caller_identity, req.from_room)
                 raise HTTPException(
                     status_code=403,
                     detail={"error": "forbidden", "message": f"Caller is not a member of room {req.from_room}"}
                 )
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Membership validation failed: {str(e)}", exc_info=True)
+            logger.error("Membership validation failed: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500, 
                 detail={"error": "validation_failed", "message": "Failed to validate room membership"}
@@ -620,21 +752,20 @@ async def twilio_transfer(req: TwilioTransferRequest, background_tasks: Backgrou
         
         # Get conversation transcript
         try:
-            existing_transcripts = transcripts.get_room_transcripts(req.from_room)
-            existing_transcript = "\n".join(existing_transcripts) if existing_transcripts else ""
+            existing_transcript = await transcripts.aget_joined_transcript(req.from_room)
             
             # Generate summary with fallback if LLM fails
             try:
-                summary_text = generate_summary(existing_transcript)
-                logger.debug(f"Generated summary: {summary_text[:100]}...")
+                summary_text = await summarize_transcript(existing_transcript)
+                logger.debug("Generated summary: %.100s...", summary_text)
             except Exception as e:
-                logger.warning(f"LLM summary generation failed, using fallback: {e}")
+                logger.warning("LLM summary generation failed, using fallback: %s", e)
                 first_120_chars = existing_transcript[:120].replace('\n', ' ').strip() \
                     if existing_transcript else "No transcript available"
                 summary_text = f"LLM unavailable — Notes: {first_120_chars} — please verify details."
             
             # Generate a unique identity for the Twilio participant
-            twilio_identity = f"twilio-{str(uuid.uuid4())[:8]}"
+            twilio_identity = f"twilio-{unique_suffix()}"
             
             # Generate a token for the Twilio participant to join the existing room
             twilio_token = mint_access_token(
@@ -643,121 +774,113 @@ async def twilio_transfer(req: TwilioTransferRequest, background_tasks: Backgrou
                 role="agent"
             )
             
-            # Create TwiML that will connect the call to the existing LiveKit room
-            twiml = f"""
-            <Response>
-                <Say voice="Polly.Joanna" language="en-US">
-                    Hello. You are being connected for a warm transfer. 
-                    Here's a summary of the conversation so far: {summary_text}
-                    Please wait while we connect you to the call.
-                </Say>
-                <Connect>
-                    <Room participantIdentity="{twilio_identity}">{req.from_room}</Room>
-                </Connect>
-            </Response>
-            """.strip()
+            # Create TwiML that will connect the call to the existing LiveKit room;
+            # the summary is LLM/transcript text, so escape it to keep the XML valid
+            twiml = TWIML_TEMPLATE.format_map({
+                "summary": xml_escape(summary_text),
+                "tid": xml_escape(twilio_identity, _XML_ATTR_ENTITIES),
+                "room": xml_escape(req.from_room),
+            })
             
             # Get Twilio client with validation
             client = get_twilio_client()
             
             # Track call attempt metrics
             start_time = time.time()
-            retry_count = 0
-            last_error = None
+            call_timeout = min(getattr(req, 'timeout_seconds', 30), 60)  # Default 30s, max 60s for Twilio API
             
-            # Implement retry with exponential backoff
-            while retry_count < MAX_RETRIES:
-                try:
-                    logger.info(f"Initiating Twilio call to {req.phone_number} (attempt {retry_count + 1}/{MAX_RETRIES})")
-                    
-                    # Get base URL for callbacks
-                    base_url = os.getenv('BASE_URL', '').strip()
-                    if not base_url:
-                        logger.warning("BASE_URL environment variable not set, using default")
-                    
-                    call = client.calls.create(
-                        to=req.phone_number,
-                        from_=TWILIO_PHONE_NUMBER,
-                        twiml=twiml,
-                        timeout=min(getattr(req, 'timeout_seconds', 30), 60),  # Default 30s, max 60s for Twilio API
-                        status_callback=f"{base_url}/twilio-status" if base_url else None,
-                        status_callback_method='POST',
-                        status_callback_event=['initiated', 'ringing', 'answered', 'completed']
-                    )
-                    
-                    # Log successful call initiation
-                    call_duration = time.time() - start_time
-                    logger.info(
-                        f"Twilio call initiated successfully in {call_duration:.2f}s. "
-                        f"SID: {call.sid}, Status: {call.status}"
-                    )
-                    
-                    # Store call information for tracking
-                    from services.database import set_call_status
-                    set_call_status(
-                        room_name=req.from_room,
-                        twilio_call_sid=call.sid,
-                        status=call.status,
-                        phone_number=req.phone_number
-                    )
-                    
-                    # Start background task to monitor call status and handle agent transfer
-                    background_tasks.add_task(
-                        handle_agent_transfer,
-                        call_sid=call.sid,
-                        room_name=req.from_room,
-                        agent_identity=req.caller_identity,
-                        twilio_identity=twilio_identity,
-                        summary=summary_text
-                    )
-                    
-                    return TwilioTransferResponse(
-                        call_sid=call.sid,
-                        to_number=req.phone_number,
-                        status=call.status
-                    )
-                    
-                except TwilioRestException as e:
-                    last_error = e
-                    retry_count += 1
-                    if retry_count < MAX_RETRIES:
-                        wait_time = TWILIO_RETRY_DELAY * (2 ** (retry_count - 1))
-                        logger.warning(
-                            f"Twilio call attempt {retry_count} failed. "
-                            f"Retrying in {wait_time:.1f}s. Error: {str(e)}"
-                        )
-                        await asyncio.sleep(wait_time)
-                    else:
-                        logger.error(
-                            f"All {MAX_RETRIES} Twilio call attempts failed. "
-                            f"Last error: {str(e)}", 
-                            exc_info=True
+            if not BASE_URL:
+                logger.warning("BASE_URL environment variable not set, using default")
+            
+            try:
+                # Retry Twilio API errors with jittered exponential backoff; the
+                # blocking SDK call runs in a worker thread between attempts
+                async for attempt in AsyncRetrying(
+                    stop=stop_after_attempt(MAX_RETRIES),
+                    wait=wait_exponential_jitter(initial=TWILIO_RETRY_DELAY, max=30),
+                    retry=retry_if_exception_type(TwilioRestException),
+                    before_sleep=before_sleep_log(logger, logging.WARNING),
+                    reraise=True
+                ):
+                    with attempt:
+                        logger.info(
+                            "Initiating Twilio call to %s (attempt %d/%d)",
+                            req.phone_number, attempt.retry_state.attempt_number, MAX_RETRIES
                         )
-                        raise HTTPException(
-                            status_code=500,
-                            detail={
-                                "error": "call_initiation_failed",
-                                "message": f"Failed to initiate call after {MAX_RETRIES} attempts",
-                                "twilio_error": str(e)
-                            }
+                        call = await asyncio.to_thread(
+                            client.calls.create,
+                            to=req.phone_number,
+                            from_=TWILIO_PHONE_NUMBER,
+                            twiml=twiml,
+                            timeout=call_timeout,
+                            status_callback=f"{BASE_URL}/twilio-status" if BASE_URL else None,
+                            status_callback_method='POST',
+                            status_callback_event=['initiated', 'ringing', 'answered', 'completed']
                         )
-                        
-                except Exception as e:
-                    logger.error(
-                        f"Unexpected error during Twilio call initiation: {str(e)}", 
-                        exc_info=True
-                    )
-                    raise HTTPException(
-                        status_code=500,
-                        detail={
-                            "error": "unexpected_error",
-                            "message": "An unexpected error occurred while initiating the call",
-                            "details": str(e)
-                        }
-                    )
+                
+                # Log successful call initiation
+                call_duration = time.time() - start_time
+                logger.info(
+                    "Twilio call initiated successfully in %.2fs. SID: %s, Status: %s",
+                    call_duration, call.sid, call.status
+                )
+                
+                # Store call information for tracking
+                publish_call_status(await aset_call_status(
+                    call_sid=call.sid,
+                    room_name=req.from_room,
+                    status=call.status,
+                    phone_number=req.phone_number
+                ))
+                
+                # Start background task to monitor call status and handle agent transfer
+                background_tasks.add_task(
+                    handle_agent_transfer,
+                    call_sid=call.sid,
+                    room_name=req.from_room,
+                    agent_identity=req.caller_identity,
+                    twilio_identity=twilio_identity,
+                    summary=summary_text,
+                    call_timeout=call_timeout
+                )
+                
+                return TwilioTransferResponse(
+                    call_sid=call.sid,
+                    to_number=req.phone_number,
+                    status=call.status
+                )
+                
+            except TwilioRestException as e:
+                logger.error(
+                    "All %d Twilio call attempts failed. Last error: %s",
+                    MAX_RETRIES, e,
+                    exc_info=True
+                )
+                raise HTTPException(
+                    status_code=500,
+                    detail={
+                        "error": "call_initiation_failed",
+                        "message": f"Failed to initiate call after {MAX_RETRIES} attempts",
+                        "twilio_error": str(e)
+                    }
+                )
+                
+            except Exception as e:
+                logger.error(
+                    "Unexpected error during Twilio call initiation: %s", e,
+                    exc_info=True
+                )
+                raise HTTPException(
+                    status_code=500,
+                    detail={
+                        "error": "unexpected_error",
+                        "message": "An unexpected error occurred while initiating the call",
+                        "details": str(e)
+                    }
+                )
                     
         except Exception as e:
-            logger.error(f"Failed to process transcript: {str(e)}", exc_info=True)
+            logger.error("Failed to process transcript: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail={
@@ -771,7 +894,7 @@ async def twilio_transfer(req: TwilioTransferRequest, background_tasks: Backgrou
         raise
         
     except Exception as e:
-        logger.error(f"Unexpected error in twilio_transfer: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in twilio_transfer: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail={
@@ -781,7 +904,7 @@ async def twilio_transfer(req: TwilioTransferRequest, background_tasks: Backgrou
         )
 
 
-async def handle_agent_transfer(call_sid: str, room_name: str, agent_identity: str, twilio_identity: str, summary: str, max_attempts: int = 12):
+async def handle_agent_transfer(call_sid: str, room_name: str, agent_identity: str, twilio_identity: str, summary: str, max_attempts: int = 12, call_timeout: int = 30):
     """
     Background task to handle the agent transfer process.
 
@@ -792,96 +915,178 @@ async def handle_agent_transfer(call_sid: str, room_name: str, agent_identity: s
         twilio_identity: The identity of the Twilio call participant
         summary: The conversation summary that was shared
         max_attempts: Maximum number of status checks to perform
+        call_timeout: Seconds Twilio lets the call ring before giving up
     """
-    logger.info(f"Starting agent transfer process for call {call_sid} in room {room_name}")
+    logger.info("Starting agent transfer process for call %s in room %s", call_sid, room_name)
 
     # Wait a moment for the Twilio call to be established
     await asyncio.sleep(5)
 
     # Disconnect Agent A
     try:
-        logger.info(f"Attempting to disconnect agent {agent_identity} from room {room_name}")
+        logger.info("Attempting to disconnect agent %s from room %s", agent_identity, room_name)
         success = await disconnect_participant(room_name, agent_identity)
         if success:
-            logger.info(f"Successfully disconnected agent {agent_identity} from room {room_name}")
+            logger.info("Successfully disconnected agent %s from room %s", agent_identity, room_name)
         else:
-            logger.warning(f"Failed to disconnect agent {agent_identity} from room {room_name}")
+            logger.warning("Failed to disconnect agent %s from room %s", agent_identity, room_name)
             # Continue even if disconnection fails, as the transfer can still proceed
     except Exception as e:
-        logger.error(f"Error disconnecting agent {agent_identity}: {str(e)}")
+        logger.error("Error disconnecting agent %s: %s", agent_identity, e)
         # Continue with the transfer even if disconnection fails
 
     # Monitor the Twilio call status
-    # Monitor the call status
-    attempt = 0
-    while attempt < max_attempts:
-        try:
-            # Get the latest call status from Twilio
-            client = get_twilio_client()
-            call = client.calls(call_sid).fetch()
-            
-            # Update our database with the latest status
-            from services.database import set_call_status
-            set_call_status(
-                room_name=room_name,
-                twilio_call_sid=call_sid,
-                status=call.status,
-                phone_number=''  # We don't have the phone number in this context
-            )
-            
-            # If call is completed/failed, we can stop checking
-            if call.status in ['completed', 'failed', 'busy', 'no-answer', 'canceled']:
-                logger.info(f"Call {call_sid} ended with status: {call.status}")
-                return
-                
-        except Exception as e:
-            logger.warning(f"Error checking call status (attempt {attempt}/{max_attempts}): {e}")
-            
-        # Wait before next check (with increasing delay)
-        await asyncio.sleep(min(5 * (attempt + 1), 30))  # Max 30s between checks
-        attempt += 1
+    if ENABLE_POLLING_FALLBACK:
+        await check_call_status_async(call_sid=call_sid, room_name=room_name, max_attempts=max_attempts)
+        return
     
-    logger.warning(f"Reached max status check attempts for call {call_sid}")
+    # Status changes arrive through the /twilio-status webhook; check once after
+    # the ring timeout in case a callback was lost
+    await asyncio.sleep(call_timeout + 10)
+    call_record = await aget_call_status(call_sid=call_sid)
+    if not call_record or call_record.get("status") not in TERMINAL_CALL_STATUSES:
+        await check_call_status_async(call_sid=call_sid, room_name=room_name, max_attempts=1)
+
+
+# Open /twilio-call-status-stream connections per room; each gets its own queue
+room_subscribers: Dict[str, List[asyncio.Queue]] = {}
+SSE_QUEUE_SIZE = 32
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _call_status_event(call_record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": call_record.get("status"),
+        "call_sid": call_record.get("call_sid"),
+        "ts": call_record.get("updated_at"),
+    }
+
+
+def publish_call_status(call_record: Optional[Dict[str, Any]]) -> None:
+    """Push a stored call status to every stream subscribed to its room"""
+    if not call_record:
+        return
+    subscribers = room_subscribers.get(call_record.get("room_name"))
+    if not subscribers:
+        return
+    event = _call_status_event(call_record)
+    for subscriber in subscribers:
+        if subscriber.full():
+            # Slow consumer; drop its oldest update rather than block the writer
+            subscriber.get_nowait()
+        subscriber.put_nowait(event)
+
+
+# Call SIDs with a status poll in flight. Membership is checked and updated
+# without awaiting in between, so the event loop makes this race-free.
+inflight_status_checks: Set[str] = set()
+
+TERMINAL_CALL_STATUSES = frozenset({'completed', 'failed', 'busy', 'no-answer', 'canceled'})
+STATUS_REFRESH_INTERVAL = 4  # Rewrite an unchanged status every Nth poll
+
+# Seconds between status polls by last known status: calls being set up change
+# state within seconds, while an answered call can last minutes
+POLL_DELAYS = {'queued': 2, 'initiated': 2, 'ringing': 3, 'in-progress': 10}
+DEFAULT_POLL_DELAY = 5
+MAX_POLL_DELAY = 30
+
+
+def next_poll_delay(call_status: Optional[str]) -> float:
+    """Delay before the next status poll, jittered so polls don't synchronize"""
+    return min(POLL_DELAYS.get(call_status, DEFAULT_POLL_DELAY) + random.uniform(0, 1), MAX_POLL_DELAY)
+
+
+async def check_call_status_async(call_sid: str, room_name: str, max_attempts: int = 12):
+    """
+    Poll Twilio for a call's status and record it until the call ends.
+
+    Returns immediately if a poll for the same call is already running, so
+    repeated status requests don't start parallel polling loops.
+
+    Args:
+        call_sid: The Twilio Call SID to check
+        room_name: The room the call belongs to
+        max_attempts: Maximum number of status checks to perform
+    """
     if not call_sid or not room_name:
         logger.warning("Missing call_sid or room_name for status check")
         return
     
-    attempt = 0
-    while attempt < max_attempts:
-        attempt += 1
-        try:
-            # Get the latest call status from Twilio
-            client = get_twilio_client()
-            call = client.calls(call_sid).fetch()
-            
-# Update our database with the latest status
-            from services.database import set_call_status
-            set_call_status(
-                room_name=room_name,
-                twilio_call_sid=call_sid,
-                status=call.status,
-                phone_number=''  # We don't have the phone number in this context
-            )
-            
-            # If call is completed/failed, we can stop checking
-            if call.status in ['completed', 'failed', 'busy', 'no-answer', 'canceled']:
-                logger.info(f"Call {call_sid} ended with status: {call.status}")
-                return
+    if call_sid in inflight_status_checks:
+        logger.debug("Status check already running for call %s", call_sid)
+        return
+    inflight_status_checks.add(call_sid)
+    
+    try:
+        attempt = 0
+        last_status = None
+        while attempt < max_attempts:
+            attempt += 1
+            delay = next_poll_delay(last_status)
+            try:
+                # Get the latest call status from Twilio
+                client = get_twilio_client()
+                call = await asyncio.to_thread(client.calls(call_sid).fetch)
+                is_final = call.status in TERMINAL_CALL_STATUSES
                 
-        except Exception as e:
-            logger.warning(f"Error checking call status (attempt {attempt}/{max_attempts}): {e}")
+                # Update our database only when the status changes, plus a
+                # periodic refresh of updated_at and always for the final status
+                if (call.status != last_status or is_final
+                        or attempt % STATUS_REFRESH_INTERVAL == 0):
+                    publish_call_status(await aset_call_status(
+                        call_sid=call_sid,
+                        room_name=room_name,
+                        status=call.status
+                    ))
+                    last_status = call.status
+                
+                # If call is completed/failed, we can stop checking
+                if is_final:
+                    logger.info("Call %s ended with status: %s", call_sid, call.status)
+                    return
+                
+                delay = next_poll_delay(call.status)
+                    
+            except TwilioRestException as e:
+                if e.status == 429:
+                    # Rate limited; the SDK doesn't expose Retry-After, so back off fully
+                    delay = MAX_POLL_DELAY
+                logger.warning("Error checking call status (attempt %d/%d): %s", attempt, max_attempts, e)
+            except Exception as e:
+                logger.warning("Error checking call status (attempt %d/%d): %s", attempt, max_attempts, e)
             
-        # Wait before next check (with increasing delay)
-        await asyncio.sleep(min(5 * attempt, 30))  # Max 30s between checks
-    
-    logger.warning(f"Reached max status check attempts for call {call_sid}")
+            # Wait before next check
+            if attempt < max_attempts:
+                await asyncio.sleep(delay)
+        
+        logger.warning("Reached max status check attempts for call %s", call_sid)
+    finally:
+        inflight_status_checks.discard(call_sid)
+
+
+# Twilio status callbacks are a few hundred bytes of urlencoded form data
+MAX_WEBHOOK_BODY_SIZE = 8192
+
+
+async def read_bounded_form(request: Request, limit: int = MAX_WEBHOOK_BODY_SIZE) -> Dict[str, str]:
+    """Parse an urlencoded request body, rejecting it with a 413 once it exceeds limit bytes"""
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=413, detail="Request body too large")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Request body too large")
+    return dict(urllib.parse.parse_qsl(body.decode('utf-8', errors='replace')))
 
 
 @app.post("/twilio-status")
 async def twilio_status_webhook(request: Request):
     """Webhook endpoint for Twilio to report call status changes."""
     try:
-        form_data = await request.form()
+        form_data = await read_bounded_form(request)
         call_sid = form_data.get('CallSid')
         call_status = form_data.get('CallStatus')
         
@@ -889,20 +1094,21 @@ async def twilio_status_webhook(request: Request):
             logger.warning("Missing CallSid or CallStatus in Twilio webhook")
             return {"status": "error", "message": "Missing required parameters"}
         
-# Update our database with the latest status
-        from services.database import set_call_status
-        set_call_status(
-            room_name=call_sid,  # Using call_sid as room_name since we don't have the room name
-            twilio_call_sid=call_sid,
-            status=call_status,
-            phone_number=''  # We don't have the phone number in this context
-        )
+        # Update our database with the latest status; the webhook doesn't
+        # carry the room name, so the call is looked up by its SID
+        try:
+            publish_call_status(await aset_call_status(call_sid=call_sid, status=call_status))
+        except ValueError:
+            logger.warning("Ignoring status update for unknown call %s", call_sid)
+            return {"status": "ignored", "message": "Unknown call"}
         
-        logger.info(f"Updated call {call_sid} status to {call_status}")
+        logger.info("Updated call %s status to %s", call_sid, call_status)
         return {"status": "ok"}
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing Twilio webhook: {e}")
+        logger.error("Error processing Twilio webhook: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -915,18 +1121,19 @@ async def get_twilio_call_status(room_name: str, background_tasks: BackgroundTas
     and optionally trigger a background refresh from Twilio if requested.
     """
     try:
-        call_status = get_call_status(room_name)
-        if not call_status or not call_status.get("twilio_call_sid"):
+        call_status = await aget_call_status(room_name)
+        if not call_status or not call_status.get("call_sid"):
             return {
                 "status": "not_found",
                 "message": f"No active call found for room {room_name}"
             }
         
-        # If the call is still active, trigger a background refresh
-        if call_status.get("status") in ['queued', 'initiated', 'ringing', 'in-progress']:
+        # If the call is still active and no webhook keeps it current, trigger
+        # a background refresh
+        if ENABLE_POLLING_FALLBACK and call_status.get("status") in ['queued', 'initiated', 'ringing', 'in-progress']:
             background_tasks.add_task(
                 check_call_status_async,
-                call_sid=call_status["twilio_call_sid"],
+                call_sid=call_status["call_sid"],
                 room_name=room_name,
                 max_attempts=1  # Just check once in the background
             )
@@ -934,15 +1141,60 @@ async def get_twilio_call_status(room_name: str, background_tasks: BackgroundTas
         # Return the current status from our database
         return {
             "status": call_status.get("status", "unknown"),
-            "call_sid": call_status.get("twilio_call_sid"),
+            "call_sid": call_status.get("call_sid"),
             "phone_number": call_status.get("phone_number"),
             "last_updated": call_status.get("updated_at"),
             "metadata": call_status.get("metadata", {})
         }
         
     except Exception as e:
-        logger.error(f"Error getting Twilio call status: {e}")
+        logger.error("Error getting Twilio call status: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get call status: {str(e)}"
         )
+
+
+@app.get("/twilio-call-status-stream/{room_name}")
+async def stream_twilio_call_status(room_name: str, request: Request):
+    """
+    Stream Twilio call status changes for a room as Server-Sent Events.
+    
+    Sends the stored status first, then an event each time the webhook or a
+    status poll records a change, until the call reaches a terminal status.
+    """
+    subscriber: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+    
+    async def events():
+        # Registered only once the body starts streaming, so a client that
+        # disconnects before then leaves no queue behind
+        try:
+            room_subscribers.setdefault(room_name, []).append(subscriber)
+            call_status = await aget_call_status(room_name)
+            if call_status:
+                subscriber.put_nowait(_call_status_event(call_status))
+            
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                yield f"data: {json.dumps(event)}\n\n"
+                if event["status"] in TERMINAL_CALL_STATUSES:
+                    break
+        finally:
+            subscribers = room_subscribers.get(room_name)
+            if subscribers:
+                subscribers.remove(subscriber)
+                if not subscribers:
+                    del room_subscribers[room_name]
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,25 +1,22 @@
 from pydantic import BaseModel, Field, validator, constr
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 import re
 from datetime import datetime
 
+# Phone number patterns, compiled once for the TwilioTransferRequest validator
+_PHONE_STRIP_RE = re.compile(r'[^\d+]')
+_E164_RE = re.compile(r'^\+[1-9]\d{1,14}$')
+
+# Constrained string types; surrounding whitespace is stripped before the
+# length check, so blank values are rejected without per-model validators
+RoomName = constr(strip_whitespace=True, min_length=1)
+Identity = constr(strip_whitespace=True, min_length=1, max_length=50)
+
 
 class CreateRoomRequest(BaseModel):
     room_name: Optional[str] = None
-    identity: constr(min_length=1, max_length=50)
-    role: str
-    
-    @validator('role')
-    def validate_role(cls, v):
-        if v not in ['agent', 'caller', 'participant']:
-            raise ValueError('Role must be one of: agent, caller, participant')
-        return v
-        
-    @validator('identity')
-    def validate_identity(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Identity cannot be empty or whitespace')
-        return v.strip()
+    identity: Identity
+    role: Literal['agent', 'caller', 'participant']
 
 
 class CreateRoomResponse(BaseModel):
@@ -28,14 +25,8 @@ class CreateRoomResponse(BaseModel):
 
 
 class JoinTokenRequest(BaseModel):
-    room_name: str = Field(..., min_length=1)
-    identity: str = Field(..., min_length=1, max_length=50)
-    
-    @validator('room_name', 'identity')
-    def validate_fields(cls, v):
-        if not v.strip():
-            raise ValueError('Field cannot be empty or whitespace')
-        return v
+    room_name: RoomName
+    identity: Identity
 
 
 class JoinTokenResponse(BaseModel):
@@ -43,17 +34,11 @@ class JoinTokenResponse(BaseModel):
 
 
 class TransferRequest(BaseModel):
-    from_room: constr(min_length=1)
+    from_room: RoomName
     to_room: Optional[str] = None
-    initiator_identity: constr(min_length=1, max_length=50)
-    target_identity: constr(min_length=1, max_length=50)
+    initiator_identity: Identity
+    target_identity: Identity
     transcript: Optional[str] = ""
-    
-    @validator('from_room', 'initiator_identity', 'target_identity')
-    def validate_fields(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Field cannot be empty or whitespace')
-        return v.strip()
 
 
 class TransferResponse(BaseModel):
@@ -78,9 +63,9 @@ class TwilioTransferRequest(BaseModel):
         caller_identity: Identity of the caller initiating the transfer (required)
         timeout_seconds: Optional timeout for the call in seconds (default: 30)
     """
-    from_room: str = Field(..., min_length=1, description="The name of the room to transfer from")
+    from_room: RoomName = Field(..., description="The name of the room to transfer from")
     phone_number: str = Field(..., min_length=10, max_length=20, description="Phone number in E.164 format")
-    caller_identity: str = Field(..., min_length=1, max_length=50, description="Identity of the caller initiating the transfer")
+    caller_identity: Identity = Field(..., description="Identity of the caller initiating the transfer")
     timeout_seconds: int = Field(30, ge=10, le=300, description="Call timeout in seconds (10-300)")
     
     @validator('phone_number')
@@ -89,10 +74,10 @@ class TwilioTransferRequest(BaseModel):
             raise ValueError('Phone number is required')
             
         # Remove all non-digit characters except leading +
-        cleaned = re.sub(r'[^\d+]', '', v)
+        cleaned = _PHONE_STRIP_RE.sub('', v)
         
         # Ensure it starts with + and has at least 10 digits
-        if not re.match(r'^\+[1-9]\d{1,14}$', cleaned):
+        if not _E164_RE.match(cleaned):
             raise ValueError(
                 'Phone number must be in E.164 format (e.g., +12125551234). ' \
                 'Must start with + followed by country code and number.'
@@ -106,13 +91,6 @@ class TwilioTransferRequest(BaseModel):
             raise ValueError('Phone number too long')
             
         return cleaned
-        
-    @validator('from_room', 'caller_identity')
-    def validate_required_fields(cls, v):
-        if not v or not v.strip():
-            raise ValueError('This field cannot be empty')
-        return v.strip()
-    
 
 
 class TwilioTransferResponse(BaseModel):
@@ -122,14 +100,8 @@ class TwilioTransferResponse(BaseModel):
 
 
 class ValidateMembershipRequest(BaseModel):
-    room_name: str = Field(..., min_length=1)
-    identity: str = Field(..., min_length=1, max_length=50)
-    
-    @validator('room_name', 'identity')
-    def validate_fields(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Field cannot be empty or whitespace')
-        return v.strip()
+    room_name: RoomName
+    identity: Identity
 
 
 class ValidateMembershipResponse(BaseModel):
@@ -1,13 +1,13 @@
 from .llm_client import (
-    GROQ_AVAILABLE,
     GROQ_API_KEY,
     generate_summary,
+    get_cached_summary,
     _fallback_summary
 )
 
 __all__ = [
-    'GROQ_AVAILABLE',
     'GROQ_API_KEY',
     'generate_summary',
+    'get_cached_summary',
     '_fallback_summary'
 ]
\ No newline at end of file
@@ -1,8 +1,13 @@
 import os
 import json
+import atexit
+import time
 import sqlite3
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Any, List, Optional, Tuple
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
@@ -11,195 +16,421 @@ logger = logging.getLogger(__name__)
 DB_PATH = os.getenv("DB_PATH", "room_store.db")
 
 
+# Connections are opened once and reused: writes share one connection behind a
+# lock (SQLite admits a single writer anyway), while each thread lazily opens
+# its own read-only connection so reads never queue behind writes
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+)
+
+STATEMENT_CACHE_SIZE = 256
+
+# Bumped whenever initialize_database() changes the schema; stored in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+# Timestamps are stored as INTEGER Unix epoch seconds; format them at read
+# time, e.g. datetime(updated_at, 'unixepoch') (see the v_transcripts view)
+_EPOCH_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+_TABLES_DDL = f"""
+CREATE TABLE IF NOT EXISTS rooms (
+    room_name TEXT PRIMARY KEY,
+    created_at INTEGER DEFAULT ({_EPOCH_NOW}),
+    updated_at INTEGER DEFAULT ({_EPOCH_NOW})
+);
+
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_name TEXT,
+    transcript TEXT,
+    timestamp INTEGER DEFAULT ({_EPOCH_NOW}),
+    FOREIGN KEY (room_name) REFERENCES rooms (room_name)
+);
+
+-- Per-room reads; the implicit rowid suffix also serves ORDER BY id
+CREATE INDEX IF NOT EXISTS idx_transcripts_room ON transcripts (room_name);
+
+CREATE TABLE IF NOT EXISTS summaries (
+    room_name TEXT PRIMARY KEY,
+    summary TEXT,
+    updated_at INTEGER DEFAULT ({_EPOCH_NOW}),
+    FOREIGN KEY (room_name) REFERENCES rooms (room_name)
+);
+
+-- Twilio integration
+CREATE TABLE IF NOT EXISTS call_status (
+    room_name TEXT PRIMARY KEY,
+    twilio_call_sid TEXT,
+    status TEXT,
+    phone_number TEXT,
+    updated_at INTEGER DEFAULT ({_EPOCH_NOW}),
+    FOREIGN KEY (room_name) REFERENCES rooms (room_name)
+);
+
+-- Readable timestamps for inspection tools
+CREATE VIEW IF NOT EXISTS v_transcripts AS
+    SELECT id, room_name, transcript, datetime(timestamp, 'unixepoch') AS ts FROM transcripts;
+"""
+
+# Rebuilds tables created before SCHEMA_VERSION 1, converting their
+# CURRENT_TIMESTAMP text into epoch seconds
+_MIGRATE_TIMESTAMPS_SQL = """
+ALTER TABLE rooms RENAME TO rooms_v0;
+ALTER TABLE transcripts RENAME TO transcripts_v0;
+ALTER TABLE summaries RENAME TO summaries_v0;
+ALTER TABLE call_status RENAME TO call_status_v0;
+""" + _TABLES_DDL + """
+INSERT INTO rooms (room_name, created_at, updated_at)
+    SELECT room_name, CAST(strftime('%s', created_at) AS INTEGER), CAST(strftime('%s', updated_at) AS INTEGER)
+    FROM rooms_v0;
+INSERT INTO transcripts (id, room_name, transcript, timestamp)
+    SELECT id, room_name, transcript, CAST(strftime('%s', timestamp) AS INTEGER) FROM transcripts_v0;
+INSERT INTO summaries (room_name, summary, updated_at)
+    SELECT room_name, summary, CAST(strftime('%s', updated_at) AS INTEGER) FROM summaries_v0;
+INSERT INTO call_status (room_name, twilio_call_sid, status, phone_number, updated_at)
+    SELECT room_name, twilio_call_sid, status, phone_number, CAST(strftime('%s', updated_at) AS INTEGER)
+    FROM call_status_v0;
+DROP TABLE transcripts_v0;
+DROP TABLE summaries_v0;
+DROP TABLE call_status_v0;
+DROP TABLE rooms_v0;
+"""
+
+# SQL statements are constant strings so each connection's prepared-statement
+# cache reuses the compiled statement across calls.
+# Writes create their room in the same transaction instead of a separate
+# ensure_room_exists() commit; transcript writes also bump updated_at
+_SQL_ENSURE_ROOM = "INSERT OR IGNORE INTO rooms (room_name) VALUES (?)"
+_SQL_TOUCH_ROOM = (
+    "INSERT INTO rooms (room_name) VALUES (?) "
+    f"ON CONFLICT(room_name) DO UPDATE SET updated_at = {_EPOCH_NOW}"
+)
+_SQL_INSERT_TRANSCRIPT = "INSERT INTO transcripts (room_name, transcript) VALUES (?, ?)"
+# id grows with every insert, so it orders lines without comparing timestamps
+_SQL_SELECT_TRANSCRIPTS = "SELECT transcript FROM transcripts WHERE room_name = ? ORDER BY id"
+# group_concat takes rows in the order the ordered subquery yields them
+_SQL_SELECT_JOINED_TRANSCRIPT = (
+    "SELECT group_concat(transcript, char(10)) FROM "
+    "(SELECT transcript FROM transcripts WHERE room_name = ? ORDER BY id)"
+)
+_SQL_UPSERT_SUMMARY = (
+    f"INSERT OR REPLACE INTO summaries (room_name, summary, updated_at) VALUES (?, ?, {_EPOCH_NOW})"
+)
+_SQL_SELECT_SUMMARY = "SELECT summary FROM summaries WHERE room_name = ?"
+_SQL_UPSERT_CALL_STATUS = f"""INSERT OR REPLACE INTO call_status 
+                   (room_name, twilio_call_sid, status, phone_number, updated_at) 
+                   VALUES (?, ?, ?, ?, {_EPOCH_NOW})"""
+_SQL_SELECT_CALL_STATUS = "SELECT twilio_call_sid, status, phone_number FROM call_status WHERE room_name = ?"
+
+# Appended transcript lines are queued and written together shortly after,
+# so a burst of appends costs one transaction instead of one per line
+TRANSCRIPT_FLUSH_DELAY = 0.01  # seconds
+TRANSCRIPT_FLUSH_RETRY_DELAY = 1.0  # seconds; after a failed flush, e.g. a locked database
+_pending_transcripts: Deque[Tuple[str, str]] = deque()
+_pending_lock = threading.Lock()
+_flush_timer: Optional[threading.Timer] = None
+
+# Short-lived caches for polled reads. Entries are (monotonic time, value);
+# writes store the new summary or a None marker invalidating the transcripts,
+# and a read only caches its result if no write landed since it started.
+SUMMARY_CACHE_TTL = 2.0  # seconds
+TRANSCRIPT_CACHE_TTL = 10.0  # seconds
+_READ_CACHE_MAX_SIZE = 1024
+_summary_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+_transcript_cache: Dict[str, Tuple[float, Optional[List[str]]]] = {}
+_read_cache_lock = threading.Lock()
+
+_write_conn: Optional[sqlite3.Connection] = None
+_write_lock = threading.RLock()
+_local = threading.local()
+
+
+def _cache_lookup(cache: Dict[str, Tuple[float, Any]], room_name: str, ttl: float) -> Any:
+    entry = cache.get(room_name)
+    if entry is not None and entry[1] is not None and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    return None
+
+
+def _cache_write(cache: Dict[str, Tuple[float, Any]], room_name: str, value: Any) -> None:
+    with _read_cache_lock:
+        if len(cache) >= _READ_CACHE_MAX_SIZE:
+            cache.clear()
+        cache[room_name] = (time.monotonic(), value)
+
+
+def _cache_read_result(cache: Dict[str, Tuple[float, Any]], room_name: str, started: float, value: Any) -> None:
+    with _read_cache_lock:
+        entry = cache.get(room_name)
+        if entry is None or entry[0] < started:
+            if len(cache) >= _READ_CACHE_MAX_SIZE:
+                cache.clear()
+            cache[room_name] = (started, value)
+
+
+def _connect(read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        conn = sqlite3.connect(
+            Path(DB_PATH).resolve().as_uri() + "?mode=ro", uri=True, cached_statements=STATEMENT_CACHE_SIZE
+        )
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
 @contextmanager
-def get_db_connection():
-    """Context manager for database connections."""
-    conn = None
+def get_db_connection(write: bool = False):
+    """Context manager yielding the shared write connection or this thread's read connection."""
+    global _write_conn
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        yield conn
+        if write:
+            with _write_lock:
+                if _write_conn is None:
+                    _write_conn = _connect()
+                try:
+                    yield _write_conn
+                except BaseException:
+                    # Don't leave a half-done transaction on the shared connection
+                    _write_conn.rollback()
+                    raise
+        else:
+            conn = getattr(_local, "conn", None)
+            if conn is None:
+                conn = _local.conn = _connect(read_only=True)
+            yield conn
     except Exception as e:
-        logger.error(f"Database connection error: {e}")
+        logger.error("Database connection error: %s", e)
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def initialize_database():
     """Initialize the database with required tables."""
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(write=True) as conn:
             cursor = conn.cursor()
+            # WAL is persistent on the file and lets readers run alongside the writer
+            cursor.execute("PRAGMA journal_mode=WAL")
             
-            # Create rooms table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS rooms (
-                room_name TEXT PRIMARY KEY,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Create transcripts table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS transcripts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                room_name TEXT,
-                transcript TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (room_name) REFERENCES rooms (room_name)
-            )
-            """)
-            
-            # Create summaries table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS summaries (
-                room_name TEXT PRIMARY KEY,
-                summary TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (room_name) REFERENCES rooms (room_name)
-            )
-            """)
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            has_tables = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rooms'"
+            ).fetchone() is not None
             
-            # Create call_status table for Twilio integration
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS call_status (
-                room_name TEXT PRIMARY KEY,
-                twilio_call_sid TEXT,
-                status TEXT,
-                phone_number TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (room_name) REFERENCES rooms (room_name)
+            # executescript() commits first, so the script carries its own transaction
+            if has_tables and version < 1:
+                logger.info("Migrating room store timestamps to epoch seconds")
+                script = _MIGRATE_TIMESTAMPS_SQL
+            else:
+                script = _TABLES_DDL
+            cursor.executescript(
+                f"BEGIN IMMEDIATE;\n{script}\nPRAGMA user_version={SCHEMA_VERSION};\nCOMMIT;"
             )
-            """)
-            
-            conn.commit()
             logger.info("Database initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
+        logger.error("Failed to initialize database: %s", e)
         raise
 
 
 def ensure_room_exists(room_name: str) -> None:
     """Ensure a room exists in the database."""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR IGNORE INTO rooms (room_name) VALUES (?)",
-                (room_name,)
-            )
+        with get_db_connection(write=True) as conn:
+            conn.execute(_SQL_ENSURE_ROOM, (room_name,))
             conn.commit()
     except Exception as e:
-        logger.error(f"Failed to ensure room exists: {e}")
+        logger.error("Failed to ensure room exists: %s", e)
         raise
 
 
 def set_transcript(room_name: str, transcript: str) -> None:
     """Set a transcript for a room."""
-    ensure_room_exists(room_name)
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO transcripts (room_name, transcript) VALUES (?, ?)",
-                (room_name, transcript)
-            )
-            cursor.execute(
-                "UPDATE rooms SET updated_at = CURRENT_TIMESTAMP WHERE room_name = ?",
-                (room_name,)
-            )
-            conn.commit()
+        with get_db_connection(write=True) as conn:
+            # Write this room's queued appends ahead of it in the same
+            # transaction; other rooms' lines are left to the timer flush
+            queued = _take_pending(room_name)
+            try:
+                conn.execute(_SQL_TOUCH_ROOM, (room_name,))
+                conn.executemany(_SQL_INSERT_TRANSCRIPT, queued)
+                conn.execute(_SQL_INSERT_TRANSCRIPT, (room_name, transcript))
+                conn.commit()
+            except BaseException:
+                _requeue(queued)
+                raise
+            _cache_write(_transcript_cache, room_name, None)
     except Exception as e:
-        logger.error(f"Failed to set transcript: {e}")
+        logger.error("Failed to set transcript: %s", e)
         raise
 
 
 def append_transcript(room_name: str, transcript: str) -> None:
-    """Append to a room's transcript."""
-    ensure_room_exists(room_name)
+    """Append to a room's transcript; the line is written by the next flush."""
+    _cache_write(_transcript_cache, room_name, None)
+    with _pending_lock:
+        _pending_transcripts.append((room_name, transcript))
+        _schedule_flush(TRANSCRIPT_FLUSH_DELAY)
+
+
+def _take_pending(room_name: str) -> List[Tuple[str, str]]:
+    """Remove and return one room's queued lines, leaving the rest queued."""
+    with _pending_lock:
+        if not _pending_transcripts:
+            return []
+        taken = [row for row in _pending_transcripts if row[0] == room_name]
+        if taken:
+            rest = [row for row in _pending_transcripts if row[0] != room_name]
+            _pending_transcripts.clear()
+            _pending_transcripts.extend(rest)
+        return taken
+
+
+def _requeue(rows: List[Tuple[str, str]]) -> None:
+    """Put unwritten lines back at the front of the queue and schedule a retry."""
+    if not rows:
+        return
+    with _pending_lock:
+        _pending_transcripts.extendleft(reversed(rows))
+        _schedule_flush(TRANSCRIPT_FLUSH_RETRY_DELAY)
+
+
+def _schedule_flush(delay: float) -> None:
+    """Start the flush timer unless one is already pending; caller holds _pending_lock."""
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(delay, _flush_from_timer)
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def _flush_from_timer() -> None:
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO transcripts (room_name, transcript) VALUES (?, ?)",
-                (room_name, transcript)
-            )
-            cursor.execute(
-                "UPDATE rooms SET updated_at = CURRENT_TIMESTAMP WHERE room_name = ?",
-                (room_name,)
-            )
-            conn.commit()
-    except Exception as e:
-        logger.error(f"Failed to append transcript: {e}")
-        raise
+        flush_transcripts()
+    except Exception:
+        # Already logged, and the lines are queued again with a retry timer
+        pass
+
+
+def flush_transcripts() -> None:
+    """Write all queued transcript lines in a single transaction.
+
+    On failure the lines go back to the front of the queue and a retry is
+    scheduled, so a locked or busy database doesn't lose them.
+    """
+    global _flush_timer
+    # Holding the write lock while draining keeps concurrent flushes in order
+    with _write_lock:
+        with _pending_lock:
+            rows = list(_pending_transcripts)
+            _pending_transcripts.clear()
+            _flush_timer = None
+        if not rows:
+            return
+        try:
+            with get_db_connection(write=True) as conn:
+                conn.executemany(_SQL_TOUCH_ROOM, [(room,) for room in dict.fromkeys(room for room, _ in rows)])
+                conn.executemany(_SQL_INSERT_TRANSCRIPT, rows)
+                conn.commit()
+        except Exception as e:
+            logger.error("Failed to append %d transcript lines, will retry: %s", len(rows), e)
+            _requeue(rows)
+            raise
+
+
+def _flush_before_read() -> bool:
+    """Flush queued appends so a read sees them; False if they couldn't be written yet."""
+    if not _pending_transcripts:
+        return True
+    try:
+        flush_transcripts()
+        return True
+    except Exception:
+        # Serve what is committed; the queued lines are retried
+        return False
+
+
+# Don't lose lines queued in the last few milliseconds before exit
+atexit.register(flush_transcripts)
 
 
 def get_transcripts(room_name: str) -> List[str]:
     """Get all transcripts for a room."""
+    cached = _cache_lookup(_transcript_cache, room_name, TRANSCRIPT_CACHE_TTL)
+    if cached is not None:
+        return list(cached)
     try:
+        started = time.monotonic()
+        flushed = _flush_before_read()
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT transcript FROM transcripts WHERE room_name = ? ORDER BY timestamp",
-                (room_name,)
-            )
-            results = cursor.fetchall()
-            return [row[0] for row in results]
+            results = conn.execute(_SQL_SELECT_TRANSCRIPTS, (room_name,)).fetchall()
+        transcripts = [row[0] for row in results]
+        if flushed:
+            # A result missing queued lines is not cached
+            _cache_read_result(_transcript_cache, room_name, started, transcripts)
+        return list(transcripts)
     except Exception as e:
-        logger.error(f"Failed to get transcripts: {e}")
+        logger.error("Failed to get transcripts: %s", e)
         return []
 
 
+def get_joined_transcript(room_name: str) -> str:
+    """Get a room's transcripts joined by newlines, concatenated inside SQLite."""
+    cached = _cache_lookup(_transcript_cache, room_name, TRANSCRIPT_CACHE_TTL)
+    if cached is not None:
+        return "\n".join(cached)
+    try:
+        _flush_before_read()
+        with get_db_connection() as conn:
+            row = conn.execute(_SQL_SELECT_JOINED_TRANSCRIPT, (room_name,)).fetchone()
+        return row[0] or ""
+    except Exception as e:
+        logger.error("Failed to get joined transcript: %s", e)
+        return ""
+
+
 def set_summary(room_name: str, summary: str) -> None:
     """Set a summary for a room."""
-    ensure_room_exists(room_name)
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO summaries (room_name, summary, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
-                (room_name, summary)
-            )
+        with get_db_connection(write=True) as conn:
+            conn.execute(_SQL_ENSURE_ROOM, (room_name,))
+            conn.execute(_SQL_UPSERT_SUMMARY, (room_name, summary))
             conn.commit()
+            _cache_write(_summary_cache, room_name, summary)
     except Exception as e:
-        logger.error(f"Failed to set summary: {e}")
+        logger.error("Failed to set summary: %s", e)
         raise
 
 
 def get_summary(room_name: str) -> Optional[str]:
     """Get the summary for a room."""
+    cached = _cache_lookup(_summary_cache, room_name, SUMMARY_CACHE_TTL)
+    if cached is not None:
+        return cached
     try:
+        started = time.monotonic()
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT summary FROM summaries WHERE room_name = ?",
-                (room_name,)
-            )
-            result = cursor.fetchone()
-            return result[0] if result else None
+            result = conn.execute(_SQL_SELECT_SUMMARY, (room_name,)).fetchone()
+        summary = result[0] if result else None
+        if summary is not None:
+            _cache_read_result(_summary_cache, room_name, started, summary)
+        return summary
     except Exception as e:
-        logger.error(f"Failed to get summary: {e}")
+        logger.error("Failed to get summary: %s", e)
         return None
 
 
 def set_call_status(room_name: str, twilio_call_sid: str, status: str, phone_number: str) -> None:
     """Set Twilio call status for a room."""
-    ensure_room_exists(room_name)
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """INSERT OR REPLACE INTO call_status 
-                   (room_name, twilio_call_sid, status, phone_number, updated_at) 
-                   VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)""",
-                (room_name, twilio_call_sid, status, phone_number)
-            )
+        with get_db_connection(write=True) as conn:
+            conn.execute(_SQL_ENSURE_ROOM, (room_name,))
+            conn.execute(_SQL_UPSERT_CALL_STATUS, (room_name, twilio_call_sid, status, phone_number))
             conn.commit()
     except Exception as e:
-        logger.error(f"Failed to set call status: {e}")
+        logger.error("Failed to set call status: %s", e)
         raise
 
 
@@ -207,12 +438,7 @@ def get_call_status(room_name: str) -> Optional[Dict[str, Any]]:
     """Get Twilio call status for a room."""
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT twilio_call_sid, status, phone_number FROM call_status WHERE room_name = ?",
-                (room_name,)
-            )
-            result = cursor.fetchone()
+            result = conn.execute(_SQL_SELECT_CALL_STATUS, (room_name,)).fetchone()
             if result:
                 return {
                     "twilio_call_sid": result[0],
@@ -221,7 +447,7 @@ def get_call_status(room_name: str) -> Optional[Dict[str, Any]]:
                 }
             return None
     except Exception as e:
-        logger.error(f"Failed to get call status: {e}")
+        logger.error("Failed to get call status: %s", e)
         return None
 
 
@@ -229,4 +455,4 @@ def get_call_status(room_name: str) -> Optional[Dict[str, Any]]:
 try:
     initialize_database()
 except Exception as e:
-    logger.error(f"Database initialization failed: {e}")
\ No newline at end of file
+    logger.error("Database initialization failed: %s", e)
\ No newline at end of file
@@ -1,14 +1,19 @@
 import os
 import time
+import hmac
+import json
+import base64
+import hashlib
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import quote
 from dotenv import load_dotenv
-import jwt
 import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import httpx
+from tenacity import AsyncRetrying, stop_after_attempt, wait_random_exponential, retry_if_exception
 
 # Load env from a local .env if present
 load_dotenv()
@@ -19,21 +24,71 @@ LIVEKIT_API_KEY = os.getenv("LIVEKIT_API_KEY", "")
 LIVEKIT_API_SECRET = os.getenv("LIVEKIT_API_SECRET", "")
 LIVEKIT_URL = os.getenv("LIVEKIT_URL", "")
 
-# Configure requests with retry logic
-retry_strategy = Retry(
-    total=3,
-    backoff_factor=1,
-    status_forcelist=[429, 500, 502, 503, 504],
-    allowed_methods=["GET", "POST"]
-)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-http = requests.Session()
-http.mount("https://", adapter)
-http.mount("http://", adapter)
+# HTTP(S) base URL of the LiveKit server API, derived from the WebSocket URL
+LIVEKIT_HTTP_URL = LIVEKIT_URL.replace("wss://", "https://").replace("ws://", "http://").rstrip("/")
+
+# orjson encodes token payloads faster; fall back to compact stdlib JSON
+try:
+    import orjson
+
+    def _json_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 # Default timeout for API calls (in seconds)
 DEFAULT_TIMEOUT = int(os.getenv("API_TIMEOUT", "10"))
 
+# Participant lookups retry network failures, rate limits and server errors
+MEMBERSHIP_MAX_ATTEMPTS = 3
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Short-lived cache of membership lookups so polling clients don't hit the
+# LiveKit API on every request
+MEMBERSHIP_CACHE_TTL = float(os.getenv("MEMBERSHIP_CACHE_TTL", "3.0"))
+# Lookups are kept in write order; the oldest is dropped past the cap
+_MEMBERSHIP_CACHE_MAX_SIZE = 1024
+_MEMBERSHIP_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, bool]]" = OrderedDict()
+_membership_cache_lock = threading.Lock()
+
+# Signed access tokens keyed by (room, identity, role, ttl); a token is reused
+# until it gets within TOKEN_REUSE_MARGIN seconds of expiring
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+TOKEN_REUSE_MARGIN = 300
+_TOKEN_CACHE: "OrderedDict[Tuple[str, str, Optional[str], int], Tuple[str, int]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+# Admin tokens live for 60s; reuse one until it is this close to expiring
+ADMIN_TOKEN_TTL = 60
+_ADMIN_TOKEN_REUSE_MARGIN = 10
+_admin_token: Tuple[str, int] = ("", 0)
+
+# HS256 JWT signing state: the header segment never changes and the keyed
+# HMAC is built once, so each token only copies it and hashes its payload
+_JWT_HEADER_SEGMENT = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+_SIGNING_HMAC = hmac.new(LIVEKIT_API_SECRET.encode("utf-8"), digestmod=hashlib.sha256)
+
+# Per-role video grants, merged into each token's room-specific grant
+_ROLE_GRANTS: Dict[Optional[str], Dict[str, bool]] = {
+    "agent": {"canPublish": True, "canSubscribe": True, "canPublishData": True},
+    "caller": {"canPublish": True, "canSubscribe": True, "canPublishData": False},
+}
+# participant or other roles
+_DEFAULT_GRANT: Dict[str, bool] = {"canPublish": True, "canSubscribe": True, "canPublishData": False}
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _encode_jwt(payload: Dict[str, Any]) -> str:
+    """Encode and sign a JWT with HS256 using the LiveKit API secret."""
+    signing_input = _JWT_HEADER_SEGMENT + b"." + _b64url(_json_bytes(payload))
+    signer = _SIGNING_HMAC.copy()
+    signer.update(signing_input)
+    return (signing_input + b"." + _b64url(signer.digest())).decode("ascii")
+
 
 def mint_access_token(*, room_name: str, identity: str, role: Optional[str] = None, ttl_seconds: int = 3600) -> str:
     """Generate a JWT token for LiveKit room access with limited privileges."""
@@ -41,34 +96,50 @@ def mint_access_token(*, room_name: str, identity: str, role: Optional[str] = No
         logger.error("LiveKit API credentials not configured")
         raise RuntimeError("LIVEKIT_API_KEY and LIVEKIT_API_SECRET must be set")
 
+    return _cached_access_token(room_name, identity, role, ttl_seconds, int(time.time()))
+
+
+def mint_tokens_bulk(
+    *, room_name: str, identities_and_roles: List[Tuple[str, Optional[str]]], ttl_seconds: int = 3600
+) -> List[str]:
+    """Generate tokens for several participants of one room, in the given order."""
+    if not LIVEKIT_API_KEY or not LIVEKIT_API_SECRET:
+        logger.error("LiveKit API credentials not configured")
+        raise RuntimeError("LIVEKIT_API_KEY and LIVEKIT_API_SECRET must be set")
+
     now = int(time.time())
-    
-    # Define permissions based on role
+    return [
+        _cached_access_token(room_name, identity, role, ttl_seconds, now)
+        for identity, role in identities_and_roles
+    ]
+
+
+def _cached_access_token(room_name: str, identity: str, role: Optional[str], ttl_seconds: int, now: int) -> str:
+    key = (room_name, identity, role, ttl_seconds)
+    with _token_cache_lock:
+        entry = _TOKEN_CACHE.get(key)
+        if entry is not None and entry[1] - now >= TOKEN_REUSE_MARGIN:
+            _TOKEN_CACHE.move_to_end(key)
+            return entry[0]
+
+    token = _sign_access_token(room_name=room_name, identity=identity, role=role, ttl_seconds=ttl_seconds, now=now)
+
+    with _token_cache_lock:
+        _TOKEN_CACHE[key] = (token, now + ttl_seconds)
+        _TOKEN_CACHE.move_to_end(key)
+        while len(_TOKEN_CACHE) > TOKEN_CACHE_SIZE:
+            _TOKEN_CACHE.popitem(last=False)
+    return token
+
+
+def _sign_access_token(*, room_name: str, identity: str, role: Optional[str], ttl_seconds: int, now: int) -> str:
+    """Build and sign the access token payload for one participant."""
     video_grant: Dict[str, Any] = {
         "room": room_name,
         "roomJoin": True,
+        **_ROLE_GRANTS.get(role, _DEFAULT_GRANT),
     }
     
-    # Add specific permissions based on role
-    if role == "agent":
-        video_grant.update({
-            "canPublish": True,
-            "canSubscribe": True,
-            "canPublishData": True,
-        })
-    elif role == "caller":
-        video_grant.update({
-            "canPublish": True,
-            "canSubscribe": True,
-            "canPublishData": False,
-        })
-    else:  # participant or other roles
-        video_grant.update({
-            "canPublish": True,
-            "canSubscribe": True,
-            "canPublishData": False,
-        })
-    
     payload = {
         "iss": LIVEKIT_API_KEY,
         "nbf": now,
@@ -78,66 +149,89 @@ def mint_access_token(*, room_name: str, identity: str, role: Optional[str] = No
     }
     
     try:
-        token = jwt.encode(payload, LIVEKIT_API_SECRET, algorithm="HS256")
-        if isinstance(token, bytes):
-            token = token.decode("utf-8")
-        logger.debug(f"Generated token for {identity} in room {room_name}")
+        token = _encode_jwt(payload)
+        logger.debug("Generated token for %s in room %s", identity, room_name)
         return token
     except Exception as e:
-        logger.error(f"Failed to generate token: {e}")
+        logger.error("Failed to generate token: %s", e)
         raise
 
 
-def validate_room_membership(*, room_name: str, identity: str) -> bool:
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry network failures, rate limits and server errors, but not bad requests or auth"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+async def validate_room_membership(http: httpx.AsyncClient, *, room_name: str, identity: str) -> bool:
     """Validate if a user is a member of a LiveKit room."""
     if not LIVEKIT_API_KEY or not LIVEKIT_API_SECRET or not LIVEKIT_URL:
         logger.warning("LiveKit API credentials or URL not configured - assuming valid membership")
         return True
     
     try:
-        # Create an admin token with room list permissions
-        admin_token = mint_admin_token()
-        
-        # Extract the server URL from the WebSocket URL
-        server_url = LIVEKIT_URL.replace("wss://", "https://").replace("ws://", "http://")
-        if server_url.endswith("/"):
-            server_url = server_url[:-1]
-        
         # Call the LiveKit API to get room participants
-        api_url = f"{server_url}/rooms/{room_name}/participants"
-        headers = {"Authorization": f"Bearer {admin_token}"}
+        api_url = f"{LIVEKIT_HTTP_URL}/rooms/{quote(room_name, safe='')}/participants"
+        headers = {"Authorization": f"Bearer {mint_admin_token()}"}
         
         try:
-            response = http.get(api_url, headers=headers, timeout=DEFAULT_TIMEOUT)
-            response.raise_for_status()
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(MEMBERSHIP_MAX_ATTEMPTS),
+                wait=wait_random_exponential(multiplier=0.5, max=4),
+                retry=retry_if_exception(_is_retryable),
+                reraise=True
+            ):
+                with attempt:
+                    response = await http.get(api_url, headers=headers, timeout=DEFAULT_TIMEOUT)
+                    response.raise_for_status()
             participants = response.json().get("participants", [])
-        except (requests.RequestException, ValueError) as e:
-            logger.warning(f"Failed to get room participants - assuming valid membership: {e}")
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning("Failed to get room participants - assuming valid membership: %s", e)
             return True
         
         # Check if the identity is in the participants list
-        for participant in participants:
-            if participant.get("identity") == identity:
-                logger.info(f"Validated {identity} is in room {room_name}")
-                return True
+        if identity in {participant.get("identity") for participant in participants}:
+            logger.info("Validated %s is in room %s", identity, room_name)
+            return True
         
-        logger.info(f"{identity} is not in room {room_name}")
+        logger.info("%s is not in room %s", identity, room_name)
         return False
-    except requests.RequestException as e:
-        logger.error(f"API request failed: {e}")
-        raise
     except Exception as e:
-        logger.error(f"Failed to validate room membership: {e}")
+        logger.error("Failed to validate room membership: %s", e)
         raise
 
 
+async def cached_validate_room_membership(http: httpx.AsyncClient, *, room_name: str, identity: str) -> bool:
+    """Validate room membership, reusing results younger than MEMBERSHIP_CACHE_TTL."""
+    key = (room_name, identity)
+    now = time.monotonic()
+    entry = _MEMBERSHIP_CACHE.get(key)
+    if entry is not None and now - entry[0] < MEMBERSHIP_CACHE_TTL:
+        return entry[1]
+
+    is_member = await validate_room_membership(http, room_name=room_name, identity=identity)
+
+    with _membership_cache_lock:
+        _MEMBERSHIP_CACHE[key] = (now, is_member)
+        _MEMBERSHIP_CACHE.move_to_end(key)
+        while len(_MEMBERSHIP_CACHE) > _MEMBERSHIP_CACHE_MAX_SIZE:
+            _MEMBERSHIP_CACHE.popitem(last=False)
+    return is_member
+
+
 def mint_admin_token() -> str:
-    """Generate an admin token for LiveKit API access."""
+    """Generate an admin token for LiveKit API access, reusing one that is still fresh."""
+    global _admin_token
     now = int(time.time())
+    token, exp = _admin_token
+    if exp - now >= _ADMIN_TOKEN_REUSE_MARGIN:
+        return token
+
     payload = {
         "iss": LIVEKIT_API_KEY,
         "nbf": now,
-        "exp": now + 60,  # Short-lived token
+        "exp": now + ADMIN_TOKEN_TTL,  # Short-lived token
         "video": {
             "roomList": True,
             "roomCreate": True,
@@ -145,9 +239,8 @@ def mint_admin_token() -> str:
         }
     }
     
-    token = jwt.encode(payload, LIVEKIT_API_SECRET, algorithm="HS256")
-    if isinstance(token, bytes):
-        token = token.decode("utf-8")
+    token = _encode_jwt(payload)
+    _admin_token = (token, now + ADMIN_TOKEN_TTL)
     return token
 
 
@@ -170,12 +263,7 @@ async def disconnect_participant(room_name: str, identity: str) -> bool:
         # Get admin token
         admin_token = mint_admin_token()
         
-        # Get the server URL (convert WebSocket URL to HTTP)
-        server_url = LIVEKIT_URL.replace("wss://", "https://").replace("ws://", "http://")
-        if server_url.endswith("/"):
-            server_url = server_url[:-1]
-            
-        api_url = f"{server_url}/twirp/livekit.RoomService/RemoveParticipant"
+        api_url = f"{LIVEKIT_HTTP_URL}/twirp/livekit.RoomService/RemoveParticipant"
         
         # Prepare the request payload
         payload = {
@@ -197,19 +285,19 @@ async def disconnect_participant(room_name: str, identity: str) -> bool:
                 timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
             ) as response:
                 if response.status == 200:
-                    logger.info(f"Successfully disconnected participant {identity} from room {room_name}")
+                    logger.info("Successfully disconnected participant %s from room %s", identity, room_name)
                     return True
                 else:
                     response_text = await response.text()
                     logger.error(
-                        f"Failed to disconnect participant {identity} from room {room_name}. "
-                        f"Status: {response.status}, Response: {response_text}"
+                        "Failed to disconnect participant %s from room %s. Status: %s, Response: %s",
+                        identity, room_name, response.status, response_text
                     )
                     return False
                     
     except asyncio.TimeoutError:
-        logger.error(f"Timeout while trying to disconnect participant {identity} from room {room_name}")
+        logger.error("Timeout while trying to disconnect participant %s from room %s", identity, room_name)
         return False
     except Exception as e:
-        logger.error(f"Error disconnecting participant {identity} from room {room_name}: {str(e)}")
+        logger.error("Error disconnecting participant %s from room %s: %s", identity, room_name, e)
         return False
@@ -1,14 +1,19 @@
 import os
+import re
+import json
 import time
+import asyncio
+import hashlib
 import logging
+import threading
 import httpx
-from typing import Optional, Dict, Any
-from requests.exceptions import HTTPError
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from tenacity import (
-    retry,
+    AsyncRetrying,
     stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
+    wait_random_exponential,
+    retry_if_exception,
     before_sleep_log
 )
 from dotenv import load_dotenv
@@ -27,240 +32,375 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
-# Import Groq
+# orjson encodes the request body faster; fall back to the stdlib encoder
 try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
+    import orjson
+
+    def _json_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
 except ImportError:
-    logger.error("Groq SDK not installed. Please install it with: pip install groq")
-    GROQ_AVAILABLE = False
-    Groq = None
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 # Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+# Model used for handoff summaries; overridable separately so a smaller or
+# newer model can be tried without touching other Groq settings
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL") or GROQ_MODEL
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1").rstrip("/")
+GROQ_API_URL = f"{GROQ_API_BASE}/chat/completions"
 API_TIMEOUT = int(os.getenv("GROQ_TIMEOUT", "30"))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+# A 2-3 sentence handoff fits well inside 80 tokens, and generation time
+# grows with every token; the blank-line stop ends it after one paragraph
+MAX_TOKENS = min(300, int(os.getenv("MAX_TOKENS", "80")))
+SUMMARY_STOP = ["\n\n"]
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "256"))
+MAX_TEXT_LENGTH = 8000  # Leave some room for the prompt
+EMPTY_SUMMARY = "No conversation to summarize."
+
+# LRU cache of generated summaries keyed by a digest of the transcript, so
+# repeated transfers of the same conversation skip the Groq round trip
+_SUMMARY_CACHE: "OrderedDict[bytes, str]" = OrderedDict()
+_SUMMARY_CACHE_LOCK = threading.Lock()
+
+# Summaries being generated right now, by the same key; concurrent requests
+# for an identical transcript wait on the first one instead of calling Groq
+_INFLIGHT_SUMMARIES: Dict[bytes, "asyncio.Future[str]"] = {}
 
 # Log configuration for debugging
-logger.info(f"GROQ_API_KEY: {'*' * 8 + GROQ_API_KEY[-4:] if GROQ_API_KEY else 'Not set'}")
-logger.info(f"GROQ_MODEL: {GROQ_MODEL}")
-logger.info(f"API_TIMEOUT: {API_TIMEOUT}")
-logger.info(f"MAX_RETRIES: {MAX_RETRIES}")
+logger.info("GROQ_API_KEY: %s", '*' * 8 + GROQ_API_KEY[-4:] if GROQ_API_KEY else 'Not set')
+logger.info("SUMMARY_MODEL: %s", SUMMARY_MODEL)
+logger.info("API_TIMEOUT: %s", API_TIMEOUT)
+logger.info("MAX_RETRIES: %s", MAX_RETRIES)
+
+# The key is checked once here, not on every summary request
+_GROQ_KEY = (GROQ_API_KEY or "").strip()
+_GROQ_KEY_VALID = _GROQ_KEY.startswith("gsk_")
+if not GROQ_API_KEY:
+    logger.error("GROQ_API_KEY is not set in environment variables")
+elif not _GROQ_KEY_VALID:
+    logger.error("Invalid GROQ_API_KEY format. It should start with 'gsk_'")
+_GROQ_HEADERS = {"Authorization": f"Bearer {_GROQ_KEY}", "Content-Type": "application/json"}
+
 
+# Constant prompt parts; only the conversation changes per request
+_SYSTEM_PROMPT = (
+    "You are an assistant creating a concise handoff summary between two human agents. "
+    "Answer with the summary only: 2-3 plain sentences, no preamble, headings, lists or markdown."
+)
+_PROMPT_PREFIX = (
+    "Summarize the following conversation between a caller and an agent in 2-3 plain sentences "
+    "covering the caller's issue, what has been done, and the next step. "
+    "Start directly with the summary; do not add a preamble, headings, bullet points or markdown.\n\n"
+    "Conversation:\n"
+)
+_PROMPT_SUFFIX = "\n\nSummary:"
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+# Request fields shared by every summary; each call adds only its messages
+_BASE_REQUEST = {
+    "model": SUMMARY_MODEL,
+    "temperature": 0.2,
+    "max_tokens": MAX_TOKENS,
+    "stop": SUMMARY_STOP,
+    "top_p": 1.0,
+    "stream": False
+}
 
-def _build_prompt(text: str) -> str:
-    return (
-        "You are an assistant creating a concise handoff summary between two human agents. "
-        "Summarize the following caller context in 2-3 short sentences, focusing on intent, status, and next steps.\n\n"
-        f"Context:\n{text}\n\nSummary:"
-    )
 
+def _build_prompt(conversation: str) -> str:
+    return _PROMPT_PREFIX + conversation + _PROMPT_SUFFIX
 
-def _retry_with_backoff(func, max_retries: int = MAX_RETRIES):
-    """Retry a function with exponential backoff."""
-    retry_count = 0
-    last_exception = None
-    
-    while retry_count < max_retries:
+
+def _truncate_transcript(text: str) -> str:
+    """Keep the end of an over-long transcript, where the latest context is.
+
+    The cut is moved to the next line start when one is close by, so the
+    prompt doesn't open mid-utterance.
+    """
+    if len(text) <= MAX_TEXT_LENGTH:
+        return text
+    tail = text[-MAX_TEXT_LENGTH:]
+    newline = tail.find("\n", 0, MAX_TEXT_LENGTH // 10)
+    return tail[newline + 1:] if newline != -1 else tail
+
+
+def _summary_cache_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _get_cached_summary(key: bytes) -> Optional[str]:
+    with _SUMMARY_CACHE_LOCK:
+        summary = _SUMMARY_CACHE.get(key)
+        if summary is not None:
+            _SUMMARY_CACHE.move_to_end(key)
+        return summary
+
+
+def _cache_summary(key: bytes, summary: str) -> None:
+    with _SUMMARY_CACHE_LOCK:
+        _SUMMARY_CACHE[key] = summary
+        _SUMMARY_CACHE.move_to_end(key)
+        while len(_SUMMARY_CACHE) > SUMMARY_CACHE_SIZE:
+            _SUMMARY_CACHE.popitem(last=False)
+
+
+def get_cached_summary(text: str) -> Optional[str]:
+    """Return the summary previously generated for this transcript, if any.
+
+    Lets async callers answer repeated transfers without a worker-thread hop.
+    """
+    if not text:
+        return None
+    return _get_cached_summary(_summary_cache_key(_truncate_transcript(text)))
+
+
+RETRY_MAX_WAIT = 10.0  # seconds
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Full-jitter exponential backoff, so concurrent failing calls spread out
+_backoff = wait_random_exponential(multiplier=1, max=RETRY_MAX_WAIT)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry network failures, rate limits and server errors, but not bad requests or auth"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+def _retry_wait(retry_state) -> float:
+    """Wait as long as the server's Retry-After asks, otherwise back off with jitter"""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError):
         try:
-            return func()
-        except Exception as e:
-            last_exception = e
-            retry_count += 1
-            logger.warning(f"Attempt {retry_count} failed: {e}")
-            if retry_count < max_retries:
-                # Exponential backoff: 1s, 2s, 4s, etc.
-                sleep_time = 2 ** (retry_count - 1)
-                time.sleep(sleep_time)
-    
-    # If we get here, all retries failed
-    logger.error(f"All {max_retries} attempts failed. Last error: {last_exception}")
-    raise last_exception
+            return min(float(exc.response.headers["retry-after"]), RETRY_MAX_WAIT)
+        except (KeyError, ValueError):
+            pass
+    return _backoff(retry_state)
 
 
-def _get_groq_client(api_key: str, timeout: int = 30):
-    """Initialize and return a Groq client with proper configuration."""
-    try:
-        # Create a custom HTTP client with timeout
-        import httpx
-        
-        # Configure the HTTP client with timeout
-        http_client = httpx.Client(timeout=timeout)
-        
-        # Initialize Groq client with the custom HTTP client
-        return Groq(
-            api_key=api_key,
-            http_client=http_client
-        )
-    except Exception as e:
-        logger.error(f"Failed to initialize Groq client: {str(e)}", exc_info=True)
-        raise
+# Circuit breaker: after GROQ_BREAKER_FAIL_MAX consecutive failed summaries,
+# skip Groq and fall back immediately. Once the open period ends a single
+# request probes Groq; each consecutive trip doubles the open period.
+GROQ_BREAKER_FAIL_MAX = int(os.getenv("GROQ_BREAKER_FAIL_MAX", "5"))
+BREAKER_MIN_RESET = 0.5  # seconds
+BREAKER_MAX_RESET = 60.0  # seconds
+_breaker_failures = 0
+_breaker_trips = 0
+_breaker_open_until = 0.0
+_breaker_probing = False
+
+
+def _breaker_allows() -> Optional[bool]:
+    """None if the circuit is open, else whether this call is the half-open probe"""
+    global _breaker_probing
+    if _breaker_failures < GROQ_BREAKER_FAIL_MAX:
+        return False
+    if _breaker_probing or time.monotonic() < _breaker_open_until:
+        return None
+    _breaker_probing = True
+    return True
+
 
-def generate_summary(text: str) -> str:
+def _breaker_record(succeeded: Optional[bool], probe: bool) -> None:
+    """Record a Groq call outcome; None (cancelled) only frees the probe slot"""
+    global _breaker_failures, _breaker_trips, _breaker_open_until, _breaker_probing
+    if probe:
+        _breaker_probing = False
+    if succeeded is None:
+        return
+    if succeeded:
+        if _breaker_failures >= GROQ_BREAKER_FAIL_MAX:
+            logger.info("Groq circuit closed")
+        _breaker_failures = _breaker_trips = 0
+        return
+
+    _breaker_failures += 1
+    if probe or _breaker_failures == GROQ_BREAKER_FAIL_MAX:
+        reset = min(BREAKER_MIN_RESET * 2 ** _breaker_trips, BREAKER_MAX_RESET)
+        _breaker_trips += 1
+        _breaker_open_until = time.monotonic() + reset
+        logger.warning("Groq circuit open for %.1fs after %d consecutive failures", reset, _breaker_failures)
+
+
+# A bare lead-in such as "Sure, here is the handoff summary" or a lone
+# "**Summary**" heading; anything with actual content after it is kept
+_PREAMBLE_ONLY = re.compile(
+    r"^[#*\s]*(?:(?:sure|okay|certainly)\b[,.!]?\s*)?"
+    r"(?:here(?:'s| is) (?:a |the |your )?(?:brief |concise |short )?(?:handoff |call )?summary"
+    r"(?: of the (?:call|conversation))?|(?:handoff |call )?summary)?[*\s.!:]*$",
+    re.IGNORECASE
+)
+
+
+def _parse_summary(data: Dict[str, Any]) -> Tuple[str, bool]:
+    """Return the summary text and whether it is complete enough to cache."""
+    choices = data.get("choices")
+    if not choices:
+        raise ValueError("No choices in API response")
+
+    content = ((choices[0].get("message") or {}).get("content") or "").strip()
+    if not content:
+        raise ValueError("Empty content in API response")
+    if content.endswith(":") or _PREAMBLE_ONLY.match(content):
+        raise ValueError("API response contains only a preamble")
+
+    # Cut off at max_tokens: usable for this transfer, but not worth keeping
+    return content, choices[0].get("finish_reason") != "length"
+
+
+async def generate_summary(http: httpx.AsyncClient, text: str) -> str:
     """
-    Generate a concise summary of the conversation using Groq API.
+    Generate a concise summary of the conversation using the Groq API.
     
     Args:
+        http: Shared async HTTP client used to call Groq
         text: The conversation text to summarize
         
     Returns:
-        A summary of the conversation or an error message if generation fails
+        A summary of the conversation or a fallback summary if generation fails
     """
-    logger.info("Starting summary generation...")
-    
-    # Check if Groq is available
-    if not GROQ_AVAILABLE:
-        error_msg = "Groq SDK is not installed. Please install it with: pip install groq"
-        logger.error(error_msg)
-        return _fallback_summary(text)
+    # Empty input is common (polling, debounced UI calls) and needs no work
+    if not text or text.isspace():
+        return EMPTY_SUMMARY
+
+    logger.debug("Starting summary generation...")
     
-    # Check if API key is configured
+    # Missing keys were logged at import
     if not GROQ_API_KEY:
-        error_msg = "GROQ_API_KEY is not set in environment variables"
-        logger.error(error_msg)
         return _fallback_summary(text)
-    
-    if not text or not text.strip():
-        logger.warning("Empty text provided for summary generation")
-        return "No conversation to summarize."
         
     # Truncate very long text to avoid API issues
-    max_text_length = 8000  # Leave some room for the prompt
-    if len(text) > max_text_length:
-        logger.warning(f"Truncating long input text from {len(text)} to {max_text_length} characters")
-        text = text[:max_text_length]
-        
-    # Check if Groq API key is configured
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    if not groq_api_key:
-        error_msg = "GROQ_API_KEY environment variable is not set"
-        logger.error(error_msg)
-        return _fallback_summary(text)
+    if len(text) > MAX_TEXT_LENGTH:
+        logger.warning("Truncating long input text from %d to %d characters", len(text), MAX_TEXT_LENGTH)
+        text = _truncate_transcript(text)
+    
+    # Identical transcripts reuse the previously generated summary
+    cache_key = _summary_cache_key(text)
+    cached_summary = _get_cached_summary(cache_key)
+    if cached_summary is not None:
+        logger.info("Returning cached summary")
+        return cached_summary
         
-    # Ensure the API key is properly formatted
-    groq_api_key = groq_api_key.strip()
-    if not groq_api_key.startswith('gsk_'):
-        error_msg = "Invalid GROQ_API_KEY format. It should start with 'gsk_'"
-        logger.error(error_msg)
+    # Malformed keys were logged at import
+    if not _GROQ_KEY_VALID:
         return _fallback_summary(text)
 
-    # Build the prompt
-    def _build_prompt(conversation: str) -> str:
-        return f"""
-        Please provide a concise handoff summary of the following conversation between a caller and an agent.
-        Focus on key points, issues, and next steps. Keep it brief but informative.
-        
-        Conversation:
-        {conversation}
-        
-        Summary:
-        """
-
-    # Define retryable exceptions at module level
-    RETRYABLE_EXCEPTIONS = (
-        Exception,
-        ConnectionError,
-        TimeoutError,
-        HTTPError,
-        httpx.RequestError,
-        httpx.HTTPStatusError,
-        httpx.TimeoutException,
-        httpx.NetworkError
-    )
-    
-    # Call Groq API with retry logic
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(RETRYABLE_EXCEPTIONS),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
-    def _call_groq():
+    # Share an identical in-flight request rather than starting another
+    inflight = _INFLIGHT_SUMMARIES.get(cache_key)
+    if inflight is not None:
+        logger.info("Waiting on in-flight summary for identical transcript")
         try:
-            logger.info("Initializing Groq client...")
-            logger.debug(f"Using API key: {groq_api_key[:5]}...{groq_api_key[-5:] if groq_api_key else ''}")
-            
-            # Set a reasonable timeout
-            timeout = int(os.getenv("GROQ_TIMEOUT", "30"))
-            
-            try:
-                client = _get_groq_client(groq_api_key, timeout)
-                prompt = _build_prompt(text)
-                logger.info("Sending request to Groq API...")
-                logger.debug(f"Using model: llama-3.1-8b-instant")
-                logger.debug(f"Prompt length: {len(prompt)} characters")
-                
-                # Prepare the request data
-                request_data = {
-                    "model": "llama-3.1-8b-instant",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are an assistant creating a concise handoff summary between two human agents. Focus on key points, next steps, and any important context."
-                        },
-                        {
-                            "role": "user", 
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.2,
-                    "max_tokens": min(300, int(os.getenv("MAX_TOKENS", "300"))),
-                    "top_p": 1.0,
-                    "stream": False
-                }
-                
-                logger.debug(f"Sending request to Groq API with timeout: {timeout}s")
-                
-                # Make the API call with error handling
-                response = client.chat.completions.create(**request_data)
-                
-                # Log response details without sensitive data
-                if hasattr(response, 'usage'):
-                    logger.debug(f"API usage - Prompt tokens: {getattr(response.usage, 'prompt_tokens', 'N/A')}, "
-                                f"Completion tokens: {getattr(response.usage, 'completion_tokens', 'N/A')}, "
-                                f"Total tokens: {getattr(response.usage, 'total_tokens', 'N/A')}")
-                
-                if not response.choices:
-                    error_msg = "No choices in API response"
-                    logger.error(error_msg)
-                    raise ValueError(error_msg)
-                    
-                message = response.choices[0].message
-                if not message or not message.content:
-                    error_msg = "Empty content in API response"
-                    logger.error(error_msg)
-                    raise ValueError(error_msg)
-                    
-                return message.content.strip()
-                
-            except Exception as api_error:
-                logger.error(f"Groq API error: {str(api_error)}")
-                if hasattr(api_error, 'response') and hasattr(api_error.response, 'text'):
-                    logger.error(f"API error response: {api_error.response.text}")
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
                 raise
-                
-        except Exception as e:
-            logger.error(f"Error in _call_groq: {str(e)}", exc_info=True)
-            raise
+            # The first request was cancelled; make our own
 
+    future = asyncio.get_running_loop().create_future()
+    _INFLIGHT_SUMMARIES[cache_key] = future
     try:
-        logger.info("Starting summary generation")
+        summary = await _request_summary(http, text, cache_key)
+    except BaseException:
+        future.cancel()
+        raise
+    finally:
+        if _INFLIGHT_SUMMARIES.get(cache_key) is future:
+            del _INFLIGHT_SUMMARIES[cache_key]
+    future.set_result(summary)
+    return summary
+
+
+async def _request_summary(http: httpx.AsyncClient, text: str, cache_key: bytes) -> str:
+    """Call Groq for a summary, caching it on success and falling back on failure."""
+    probe = _breaker_allows()
+    if probe is None:
+        logger.warning("Groq circuit open - using fallback summary")
+        return _fallback_summary(text)
+
+    prompt = _build_prompt(text)
+    logger.debug("Using model: %s", SUMMARY_MODEL)
+    logger.debug("Prompt length: %d characters", len(prompt))
+
+    # Serialize the request once; retries resend the same bytes
+    body = _json_bytes({
+        **_BASE_REQUEST,
+        "messages": [_SYSTEM_MESSAGE, {"role": "user", "content": prompt}]
+    })
+
+    # True once Groq answers, False if the call fails, None if cancelled
+    groq_answered: Optional[bool] = None
+    try:
+        logger.info("Sending request to Groq API...")
         start_time = time.time()
         
-        # Use the retry mechanism to call the Groq API
-        summary = _retry_with_backoff(_call_groq)
+        # Call the Groq API with retry logic
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(MAX_RETRIES),
+            wait=_retry_wait,
+            retry=retry_if_exception(_is_retryable),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True
+        ):
+            with attempt:
+                response = await http.post(
+                    GROQ_API_URL, content=body, headers=_GROQ_HEADERS, timeout=API_TIMEOUT
+                )
+                response.raise_for_status()
+        groq_answered = True
+
+        data = response.json()
+        
+        # Log response details without sensitive data
+        usage = data.get("usage")
+        if usage and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "API usage - Prompt tokens: %s, Completion tokens: %s, Total tokens: %s",
+                usage.get('prompt_tokens', 'N/A'),
+                usage.get('completion_tokens', 'N/A'),
+                usage.get('total_tokens', 'N/A'),
+            )
+
+        summary, complete = _parse_summary(data)
         
         duration = time.time() - start_time
-        logger.info(f"Successfully generated summary in {duration:.2f}s")
-        logger.debug(f"Generated summary: {summary[:100]}...")  # Log first 100 chars
+        logger.info("Successfully generated summary with %s in %.2fs", SUMMARY_MODEL, duration)
+        logger.debug("Generated summary: %.100s...", summary)  # Log first 100 chars
         
+        # Only complete LLM summaries are cached, never fallbacks or truncated ones
+        if complete:
+            _cache_summary(cache_key, summary)
+        else:
+            logger.warning("Summary hit the %d token limit; not caching it", MAX_TOKENS)
         return summary
         
     except Exception as e:
-        logger.error(f"Groq summarization failed: {str(e)}", exc_info=True)
+        if groq_answered is None:
+            groq_answered = False
+        logger.error("Groq summarization failed: %s", e, exc_info=True)
+        if isinstance(e, httpx.HTTPStatusError):
+            logger.error("API error response: %s", e.response.text)
         return _fallback_summary(text)
+    finally:
+        _breaker_record(groq_answered, probe)
+
+
+async def warm_up(http: httpx.AsyncClient) -> None:
+    """Open the Groq connection and check the summary model before the first transfer needs it."""
+    if not _GROQ_KEY_VALID:
+        return
+    try:
+        response = await http.get(
+            f"{GROQ_API_BASE}/models/{SUMMARY_MODEL}",
+            headers=_GROQ_HEADERS,
+            timeout=API_TIMEOUT
+        )
+        response.raise_for_status()
+        logger.info("Groq connection warmed up for model %s", SUMMARY_MODEL)
+    except Exception as e:
+        logger.warning("Groq warm-up for model %s failed: %s", SUMMARY_MODEL, e)
 
 
 def _fallback_summary(text: str) -> str:
@@ -287,5 +427,5 @@ def _fallback_summary(text: str) -> str:
         return "LLM unavailable — Please verify all details with the caller."
         
     except Exception as e:
-        logger.warning(f"Error in fallback summary: {str(e)}")
+        logger.warning("Error in fallback summary: %s", e)
         return "LLM unavailable — No summary available. Please verify all details with the caller."
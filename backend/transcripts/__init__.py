@@ -1,21 +1,73 @@
 """
 Transcripts package for handling call transcripts and related operations.
 """
+import asyncio
+import os
+from typing import Any, Callable, List, Optional
+
+from . import manager
+from .manager import TranscriptManager, transcript_manager
+
+# TRANSCRIPT_STORE=sqlite keeps room transcripts and summaries in the
+# WAL-mode room store database instead of process memory, so they
+# survive restarts and don't count against the in-memory room cap
+TRANSCRIPT_STORE = os.getenv("TRANSCRIPT_STORE", "memory").lower()
+if TRANSCRIPT_STORE == "sqlite":
+    from services import transcripts as _store
+else:
+    _store = manager
+
+get_room_transcripts = _store.get_room_transcripts
+get_joined_transcript = _store.get_joined_transcript
+set_room_transcript = _store.set_room_transcript
+get_room_summary = _store.get_room_summary
+set_room_summary = _store.set_room_summary
+
+
+async def _run(func: Callable[..., Any], *args: Any) -> Any:
+    # SQLite calls can wait on disk and on the write lock, so they run in
+    # a worker thread; the in-memory store is cheap enough to call inline
+    if _store is manager:
+        return func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+async def aget_room_transcripts(room_name: str) -> List[str]:
+    """Async variant of get_room_transcripts()."""
+    return await _run(get_room_transcripts, room_name)
+
+
+async def aget_joined_transcript(room_name: str) -> str:
+    """Async variant of get_joined_transcript()."""
+    return await _run(get_joined_transcript, room_name)
+
+
+async def aset_room_transcript(room_name: str, transcript: str) -> None:
+    """Async variant of set_room_transcript()."""
+    await _run(set_room_transcript, room_name, transcript)
+
+
+async def aget_room_summary(room_name: str) -> Optional[str]:
+    """Async variant of get_room_summary()."""
+    return await _run(get_room_summary, room_name)
+
+
+async def aset_room_summary(room_name: str, summary: str) -> None:
+    """Async variant of set_room_summary()."""
+    await _run(set_room_summary, room_name, summary)
 
-from .manager import (
-    TranscriptManager,
-    transcript_manager,
-    get_room_transcripts,
-    set_room_transcript,
-    get_room_summary,
-    set_room_summary
-)
 
 __all__ = [
     'TranscriptManager',
     'transcript_manager',
     'get_room_transcripts',
+    'get_joined_transcript',
     'set_room_transcript',
     'get_room_summary',
-    'set_room_summary'
+    'set_room_summary',
+    'aget_room_transcripts',
+    'aget_joined_transcript',
+    'aset_room_transcript',
+    'aget_room_summary',
+    'aset_room_summary'
 ]
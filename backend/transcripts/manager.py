@@ -1,25 +1,40 @@
 """
 Module for handling call transcripts and related operations.
 """
-from typing import Dict, List, Optional, Any
-import json
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import logging
+import os
+import sys
 import time
 
 logger = logging.getLogger(__name__)
 
-# Global store for room data
-ROOM_STORE: Dict[str, Dict[str, Any]] = {}
+# Entries kept per call; past the cap the oldest are dropped, trimming a
+# tenth at a time so a long call doesn't shift its lists on every append
+TRANSCRIPT_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_MAX_ENTRIES", "10000"))
+_TRIM_COUNT = max(1, TRANSCRIPT_MAX_ENTRIES // 10)
+
+# Rooms whose transcripts and summaries are kept; the least recently
+# written room is dropped once the cap is reached
+ROOM_STORE_MAX_ROOMS = int(os.getenv("ROOM_STORE_MAX_ROOMS", "10000"))
 
 class TranscriptManager:
     """Manages call transcripts and related operations."""
     
     def __init__(self):
-        self.transcripts: Dict[str, List[Dict]] = {}
-        self.room_transcripts: Dict[str, List[str]] = {}
-        self.room_summaries: Dict[str, str] = {}
+        # Per call: parallel (texts, speakers, timestamps) columns, so an
+        # entry costs three appends instead of a dict
+        self.transcripts: Dict[str, Tuple[List[str], List[str], "array[float]"]] = {}
+        # Formatted call transcripts, invalidated whenever a call's entries change
+        self._formatted_transcripts: Dict[str, str] = {}
+        self.room_transcripts: "OrderedDict[str, List[str]]" = OrderedDict()
+        self.room_summaries: "OrderedDict[str, str]" = OrderedDict()
+        # Newline-joined room transcripts, invalidated whenever a room's list changes
+        self._joined_room_transcripts: Dict[str, str] = {}
     
-    async def add_transcript_entry(
+    def add_transcript_entry(
         self, 
         call_sid: str, 
         text: str, 
@@ -34,19 +49,21 @@ class TranscriptManager:
             speaker: The speaker identifier
             timestamp: Optional timestamp of the transcription
         """
-        if call_sid not in self.transcripts:
-            self.transcripts[call_sid] = []
+        columns = self.transcripts.get(call_sid)
+        if columns is None:
+            columns = self.transcripts[call_sid] = ([], [], array('d'))
             
-        entry = {
-            'text': text,
-            'speaker': speaker,
-            'timestamp': timestamp or time.time()
-        }
-        
-        self.transcripts[call_sid].append(entry)
-        logger.debug(f"Added transcript entry for call {call_sid}")
+        texts, speakers, timestamps = columns
+        texts.append(text)
+        # The same few speakers repeat on every entry; share one string each
+        speakers.append(sys.intern(speaker))
+        timestamps.append(timestamp or time.time())
+        if len(texts) > TRANSCRIPT_MAX_ENTRIES:
+            del texts[:_TRIM_COUNT], speakers[:_TRIM_COUNT], timestamps[:_TRIM_COUNT]
+        self._formatted_transcripts.pop(call_sid, None)
+        logger.debug("Added transcript entry for call %s", call_sid)
     
-    async def get_transcript(self, call_sid: str) -> List[Dict]:
+    def get_transcript(self, call_sid: str) -> List[Dict]:
         """Retrieve the full transcript for a call.
         
         Args:
@@ -55,28 +72,39 @@ class TranscriptManager:
         Returns:
             List of transcript entries
         """
-        return self.transcripts.get(call_sid, [])
+        columns = self.transcripts.get(call_sid)
+        if columns is None:
+            return []
+        return [
+            {'text': text, 'speaker': speaker, 'timestamp': timestamp}
+            for text, speaker, timestamp in zip(*columns)
+        ]
     
-    async def get_formatted_transcript(self, call_sid: str) -> str:
+    def get_formatted_transcript(self, call_sid: str) -> str:
         """Get a formatted string of the transcript.
         
+        The string is cached until the call's transcript changes.
+        
         Args:
             call_sid: The unique identifier for the call
             
         Returns:
             Formatted transcript as a string
         """
-        transcript = await self.get_transcript(call_sid)
-        if not transcript:
+        formatted = self._formatted_transcripts.get(call_sid)
+        if formatted is not None:
+            return formatted
+
+        columns = self.transcripts.get(call_sid)
+        if not columns or not columns[0]:
             return "No transcript available."
             
-        formatted = []
-        for entry in transcript:
-            formatted.append(f"[{entry['speaker']}] {entry['text']}")
-            
-        return "\n".join(formatted)
+        texts, speakers, _ = columns
+        formatted = "\n".join(f"[{speaker}] {text}" for speaker, text in zip(speakers, texts))
+        self._formatted_transcripts[call_sid] = formatted
+        return formatted
     
-    async def clear_transcript(self, call_sid: str) -> bool:
+    def clear_transcript(self, call_sid: str) -> bool:
         """Clear the transcript for a call.
         
         Args:
@@ -87,6 +115,7 @@ class TranscriptManager:
         """
         if call_sid in self.transcripts:
             del self.transcripts[call_sid]
+            self._formatted_transcripts.pop(call_sid, None)
             return True
         return False
 
@@ -99,8 +128,14 @@ class TranscriptManager:
         """
         if room_name not in self.room_transcripts:
             self.room_transcripts[room_name] = []
+            while len(self.room_transcripts) > ROOM_STORE_MAX_ROOMS:
+                evicted, _ = self.room_transcripts.popitem(last=False)
+                self._joined_room_transcripts.pop(evicted, None)
+        else:
+            self.room_transcripts.move_to_end(room_name)
         self.room_transcripts[room_name].append(transcript)
-        logger.debug(f"Added transcript for room {room_name}")
+        self._joined_room_transcripts.pop(room_name, None)
+        logger.debug("Added transcript for room %s", room_name)
 
     def get_room_transcripts(self, room_name: str) -> List[str]:
         """Get all transcripts for a room.
@@ -113,6 +148,26 @@ class TranscriptManager:
         """
         return self.room_transcripts.get(room_name, [])
 
+    def get_joined_transcript(self, room_name: str) -> str:
+        """Get all transcripts for a room joined into a single string.
+        
+        The joined string is cached until the room's transcripts change.
+        
+        Args:
+            room_name: The unique identifier for the room
+            
+        Returns:
+            The room's transcripts separated by newlines, or an empty string
+        """
+        joined = self._joined_room_transcripts.get(room_name)
+        if joined is None:
+            room_transcripts = self.room_transcripts.get(room_name)
+            if room_transcripts is None:
+                return ""
+            joined = "\n".join(room_transcripts)
+            self._joined_room_transcripts[room_name] = joined
+        return joined
+
     def set_room_summary(self, room_name: str, summary: str) -> None:
         """Set a summary for a room.
         
@@ -121,7 +176,10 @@ class TranscriptManager:
             summary: The summary text to store
         """
         self.room_summaries[room_name] = summary
-        logger.debug(f"Added summary for room {room_name}")
+        self.room_summaries.move_to_end(room_name)
+        while len(self.room_summaries) > ROOM_STORE_MAX_ROOMS:
+            self.room_summaries.popitem(last=False)
+        logger.debug("Added summary for room %s", room_name)
 
     def get_room_summary(self, room_name: str) -> Optional[str]:
         """Get the summary for a room.
@@ -144,6 +202,9 @@ def set_room_transcript(room_name: str, transcript: str) -> None:
 def get_room_transcripts(room_name: str) -> List[str]:
     return transcript_manager.get_room_transcripts(room_name)
 
+def get_joined_transcript(room_name: str) -> str:
+    return transcript_manager.get_joined_transcript(room_name)
+
 def set_room_summary(room_name: str, summary: str) -> None:
     transcript_manager.set_room_summary(room_name, summary)
 